@@ -1,7 +1,17 @@
 import os
-import asyncio
-import gradio as gr
-from research_manager import ResearchManager
+import time
+import metrics
+from report_stream import PartialReport
+
+# gradio and the research pipeline (agents SDK, agents, caches) are imported lazily:
+# build_ui() loads gradio, warm_up() or the first request loads the pipeline, so
+# importing this module is cheap and the UI comes up before the pipeline is loaded.
+
+# Minimum seconds between re-renders of a streaming draft
+UI_REFRESH_S = float(os.getenv("UI_REFRESH_S", "0.25"))
+# Research sessions running at once; further requests wait in Gradio's queue
+SESSION_CONCURRENCY = int(os.getenv("SESSION_CONCURRENCY", "32"))
+SESSION_QUEUE_SIZE = int(os.getenv("SESSION_QUEUE_SIZE", "128"))
 
 # Optional banner if key is missing
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
@@ -10,38 +20,47 @@ BANNER = None if OPENAI_API_KEY else (
     "Add it in <i>Settings → Secrets</i> and restart the Space."
 )
 
-def stream(query: str):
+async def stream(query: str):
     """
-    Synchronous generator wrapper around the async ResearchManager.
-    Gradio streams each yielded chunk to the Markdown output.
+    Async generator handler: Gradio drives it on its own long-lived event loop, so
+    every session shares one loop (and the SDK's pooled HTTP connections) instead of
+    pinning a worker thread and a fresh loop per request.
+    Identical questions asked concurrently share one run (see run_registry.py).
+    Streaming drafts (PartialReport) are coalesced to at most one refresh per
+    UI_REFRESH_S; status lines and the final report are always forwarded.
     """
-    async def agen():
-        rm = ResearchManager()
-        async for chunk in rm.run(query):
-            yield chunk
+    from run_registry import run_registry
 
-    loop = asyncio.new_event_loop()
+    last_refresh = 0.0
     try:
-        asyncio.set_event_loop(loop)
-        aiter = agen()
-        while True:
-            try:
-                chunk = loop.run_until_complete(aiter.__anext__())
-            except StopAsyncIteration:
-                break
-            except Exception as e:
-                yield f"**Error:** {e}"
-                break
-            else:
-                yield chunk
-    finally:
-        try:
-            loop.run_until_complete(loop.shutdown_asyncgens())
-        except Exception:
-            pass
-        loop.close()
+        async for chunk in run_registry.stream(query):
+            if isinstance(chunk, PartialReport):
+                now = time.monotonic()
+                if now - last_refresh < UI_REFRESH_S:
+                    continue  # superseded by the next snapshot
+                last_refresh = now
+            yield chunk
+    except Exception as e:
+        yield f"**Error:** {e}"
+
+def warm_up() -> float:
+    """Load the research pipeline and build its agents ahead of the first request; seconds taken."""
+    start = time.perf_counter()
+    import run_registry  # noqa: F401  (imports research_manager and the agents SDK)
+    from lazy_agents import build_all
+
+    build_all()  # agents are otherwise built on first use, mid-request
+    return time.perf_counter() - start
+
+async def warm_connection():
+    """Page-load hook: open a pooled connection to the OpenAI API (once per event loop)."""
+    from openai_client import openai_clients
+
+    await openai_clients.warm_up()
 
 def build_ui():
+    import gradio as gr
+
     with gr.Blocks(title="Agentic Research") as demo:
         gr.Markdown("## Agentic Research (Planner → Search → Writer → Evaluator)")
         if BANNER:
@@ -58,8 +77,11 @@ def build_ui():
 
         out = gr.Markdown(label="Research stream")
 
-        run.click(stream, inputs=q, outputs=out)
-        q.submit(stream, inputs=q, outputs=out)
+        # Both triggers share one concurrency pool
+        run.click(stream, inputs=q, outputs=out,
+                  concurrency_limit=SESSION_CONCURRENCY, concurrency_id="research")
+        q.submit(stream, inputs=q, outputs=out,
+                 concurrency_limit=SESSION_CONCURRENCY, concurrency_id="research")
 
         gr.Examples(
             examples=[
@@ -71,10 +93,31 @@ def build_ui():
             label="Try one",
         )
 
+        demo.load(warm_connection, queue=False, show_progress="hidden")
+
     return demo
 
-demo = build_ui()
-demo.queue()
+_demo = None
+
+def get_demo():
+    """The queued Blocks app, built on first call."""
+    global _demo
+    if _demo is None:
+        _demo = build_ui()
+        _demo.queue(max_size=SESSION_QUEUE_SIZE)
+    return _demo
+
+def __getattr__(name: str):
+    # `app.demo` (gradio's reload mode, Spaces) builds the UI on first access
+    if name == "demo":
+        return get_demo()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 if __name__ == "__main__":
-    demo.launch()
+    if metrics.METRICS_PORT:
+        metrics.start_http_server(int(metrics.METRICS_PORT))
+    demo = get_demo()
+    # Serve the UI first, then load the pipeline while the first visitor types
+    demo.launch(prevent_thread_lock=True)
+    print(f"Research pipeline loaded in {warm_up():.1f}s")
+    demo.block_thread()
@@ -0,0 +1,209 @@
+"""
+Batch research over a JSONL file of queries.
+
+    python batch_research.py queries.jsonl results.jsonl --parallel 4
+
+Each input line needs a "query" (or "question" / "title") and may carry an "id"
+(or "request_id"); the line number is used otherwise. One result line is appended
+per query as soon as it finishes, with the report, eval scores, the local citation
+checks (report_analysis.py) and per-stage timings.
+Rerunning with the same output file skips ids already recorded with status "ok",
+so an interrupted sweep resumes where it stopped; failed queries are retried.
+
+With --email, each finished report is rendered to HTML (report_html.py) and sent
+through the shared delivery queue (delivery.py) to the line's "email" field, or
+RECIPIENT_EMAIL when it has none. The result line is written first; the outcome of
+the send follows as its own line ({"id", "status": "email", "emailed_to" or
+"email_error"}), so a failed send doesn't undo the research. On resume, finished
+reports not yet delivered (no email line, or only failed sends) are sent again;
+ones already delivered are not.
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from datetime import datetime, timezone
+
+from delivery import RECIPIENT_EMAIL, Email, delivery_queue
+from openai_client import openai_clients
+from report_analysis import analyze_report
+from report_html import render_report_email
+from research_manager import ResearchManager
+from writer_agent import ReportData
+
+BATCH_PARALLELISM = int(os.getenv("BATCH_PARALLELISM", "4"))
+
+
+def load_queries(path: str) -> list[dict]:
+    queries = []
+    with open(path, encoding="utf-8") as f:
+        for lineno, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            query = row.get("query") or row.get("question") or row.get("title")
+            if not query:
+                print(f"Skipping line {lineno}: no query/question/title field")
+                continue
+            qid = str(row.get("id") or row.get("request_id") or lineno)
+            queries.append({"id": qid, "query": query, "email": row.get("email")})
+    return queries
+
+
+def load_completed(path: str) -> set[str]:
+    """Ids already finished successfully; a torn last line from a crash is ignored."""
+    done: set[str] = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if row.get("status") == "ok":
+                done.add(str(row.get("id")))
+    return done
+
+
+def load_unsent(path: str) -> list[dict]:
+    """Finished rows with no successful send recorded: failed sends, or a crash between the two lines."""
+    rows: dict[str, dict] = {}
+    emailed: set[str] = set()
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if row.get("status") == "ok":
+                rows[str(row.get("id"))] = row
+            elif row.get("status") == "email" and row.get("emailed_to"):
+                emailed.add(str(row.get("id")))
+    return [row for qid, row in rows.items() if qid not in emailed]
+
+
+class ResultWriter:
+    """Appends one JSON line per result, flushed and fsync'd so a crash loses at most the in-flight line."""
+
+    def __init__(self, path: str):
+        self._f = open(path, "a+", encoding="utf-8")
+        self._lock = asyncio.Lock()
+        # Terminate a torn line left by a crash so the next record starts cleanly
+        if self._f.tell() > 0:
+            self._f.seek(self._f.tell() - 1)
+            if self._f.read(1) != "\n":
+                self._f.write("\n")
+
+    async def write(self, row: dict) -> None:
+        async with self._lock:
+            self._f.write(json.dumps(row, ensure_ascii=False) + "\n")
+            self._f.flush()
+            os.fsync(self._f.fileno())
+
+    def close(self) -> None:
+        self._f.close()
+
+
+async def email_report(row: dict, to: str) -> dict:
+    """The email line for a finished row: {"id", "status": "email", "emailed_to" or "email_error"}"""
+    report = ReportData(short_summary=row["short_summary"], markdown_report=row["report"],
+                        follow_up_questions=row["follow_up_questions"])
+    subject, html, text = render_report_email(row["query"], report, row["sources"])
+    outcome = {"id": row["id"], "status": "email"}
+    try:
+        await delivery_queue.send(Email(to=to, subject=subject, html=html, text=text))
+        outcome["emailed_to"] = to
+    except Exception as e:
+        outcome["email_error"] = f"{e.__class__.__name__}: {e}"
+    return outcome
+
+
+async def run_one(item: dict) -> dict:
+    rm = ResearchManager(stream_report=False)
+    row = {"id": item["id"], "query": item["query"]}
+    start = time.perf_counter()
+    try:
+        async for chunk in rm.run(item["query"]):
+            if len(chunk) < 200:  # status lines only, not the report itself
+                print(f"[{item['id']}] {chunk}")
+        row.update({
+            "status": "ok",
+            "report": rm.report.markdown_report,
+            "short_summary": rm.report.short_summary,
+            "follow_up_questions": rm.report.follow_up_questions,
+            "eval": rm.eval_report.model_dump(),
+            "sources": rm.sources,
+            "analysis": analyze_report(rm.report.markdown_report, rm.sources).as_dict(),
+            "dropped_searches": [dropped.query for dropped in rm.dropped_searches],
+            "dropped_reason": rm.dropped_reason,
+            "rounds": [stats.as_dict() for stats in rm.rounds],
+            "reused_from": {"query": rm.reused.query, "similarity": rm.reused.similarity} if rm.reused else None,
+        })
+    except Exception as e:
+        row.update({"status": "error", "error": f"{e.__class__.__name__}: {e}"})
+    row["timings"] = {**rm.timings, "wall": time.perf_counter() - start}
+    row["metrics"] = rm.metrics.summary()
+    row["finished_at"] = datetime.now(timezone.utc).isoformat()
+    return row
+
+
+async def run_batch(input_path: str, output_path: str, parallel: int = BATCH_PARALLELISM,
+                    email: bool = False) -> None:
+    queries = load_queries(input_path)
+    done = load_completed(output_path)
+    todo = [q for q in queries if q["id"] not in done]
+    recipients = {q["id"]: q.get("email") or RECIPIENT_EMAIL for q in queries}
+    unsent = [row for row in load_unsent(output_path) if recipients.get(str(row["id"]))] if email else []
+    print(f"{len(queries)} queries, {len(queries) - len(todo)} already done, running {len(todo)} "
+          f"with parallelism {parallel}")
+
+    writer = ResultWriter(output_path)
+    sem = asyncio.Semaphore(parallel)
+    finished = 0
+
+    async def send(row: dict):
+        # Sent outside the research slot: delivery waits for its batch to fill
+        outcome = await email_report(row, recipients[str(row["id"])])
+        await writer.write(outcome)
+        print(f"[{row['id']}] " + (f"emailed {outcome['emailed_to']}" if "emailed_to" in outcome
+                                   else f"email failed: {outcome['email_error']}"))
+
+    async def worker(item: dict):
+        nonlocal finished
+        async with sem:
+            row = await run_one(item)
+        # Saved before the email goes out, so a crash while sending can't lose the research
+        await writer.write(row)
+        finished += 1
+        print(f"[{item['id']}] {row['status']} ({finished}/{len(todo)})")
+        if email and row["status"] == "ok" and recipients[item["id"]]:
+            await send(row)
+
+    if unsent:
+        print(f"Sending {len(unsent)} finished reports not emailed before the restart")
+    try:
+        await asyncio.gather(*(send(row) for row in unsent), *(worker(item) for item in todo))
+    finally:
+        writer.close()
+        await openai_clients.aclose()
+        if email:
+            await delivery_queue.close()
+            print(f"Email delivery: {delivery_queue.stats()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="JSONL file of queries")
+    parser.add_argument("output", help="JSONL file to append results to (also the resume log)")
+    parser.add_argument("--parallel", type=int, default=BATCH_PARALLELISM, help="queries researched at once")
+    parser.add_argument("--email", action="store_true", help="email each finished report")
+    args = parser.parse_args()
+    asyncio.run(run_batch(args.input, args.output, args.parallel, args.email))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Load test: how many concurrent research sessions one process sustains with the
+legacy per-request event loop (one Gradio worker thread per session) versus the
+shared-loop async handler. Uses fake_runner, so no API calls are made.
+
+    python bench_sessions.py --sessions 200 --scale 0.1
+"""
+import argparse
+import asyncio
+import json
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import fake_runner
+from research_manager import ResearchManager
+from scheduler import TokenBucket, scheduler
+from report_cache import report_cache
+from checkpoints import checkpoints
+from search_cache import search_cache
+from source_store import source_store
+
+# Gradio runs sync handlers in AnyIO's worker pool, which defaults to 40 threads
+GRADIO_WORKER_THREADS = 40
+
+
+def legacy_stream(query: str):
+    """The pre-async app.stream: a fresh event loop per request, driven chunk by chunk."""
+    async def agen():
+        async for chunk in ResearchManager().run(query):
+            yield chunk
+
+    loop = asyncio.new_event_loop()
+    try:
+        asyncio.set_event_loop(loop)
+        aiter = agen()
+        while True:
+            try:
+                chunk = loop.run_until_complete(aiter.__anext__())
+            except StopAsyncIteration:
+                break
+            yield chunk
+    finally:
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        loop.close()
+
+
+class Gauge:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+        self.peak_threads = threading.active_count()
+
+    def enter(self):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            self.peak_threads = max(self.peak_threads, threading.active_count())
+
+    def leave(self):
+        with self._lock:
+            self.active -= 1
+
+
+def bench_legacy(n: int, workers: int) -> dict:
+    gauge = Gauge()
+
+    def session(i: int):
+        gauge.enter()
+        try:
+            for _ in legacy_stream(f"legacy query {i}"):
+                pass
+        finally:
+            gauge.leave()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(session, range(n)))
+    return _summary("legacy: loop per request", n, time.perf_counter() - start, gauge)
+
+
+def bench_shared(n: int, limit: int) -> dict:
+    from app import stream  # imported here so the legacy run doesn't pay for it
+
+    gauge = Gauge()
+
+    async def main():
+        sem = asyncio.Semaphore(limit)  # what Gradio's concurrency_limit enforces
+
+        async def session(i: int):
+            async with sem:
+                gauge.enter()
+                try:
+                    async for _ in stream(f"shared query {i}"):
+                        pass
+                finally:
+                    gauge.leave()
+
+        await asyncio.gather(*(session(i) for i in range(n)))
+
+    start = time.perf_counter()
+    asyncio.run(main())
+    return _summary(f"shared loop (limit {limit})", n, time.perf_counter() - start, gauge)
+
+
+def _summary(name: str, n: int, wall: float, gauge: Gauge) -> dict:
+    return {
+        "mode": name,
+        "sessions": n,
+        "wall_s": round(wall, 2),
+        "sessions_per_s": round(n / wall, 2),
+        "peak_concurrent_sessions": gauge.peak,
+        "peak_threads": gauge.peak_threads,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--scale", type=float, default=0.1, help="multiplier on simulated model latency")
+    parser.add_argument("--limit", type=int, default=128, help="session concurrency for the shared loop")
+    parser.add_argument("--workers", type=int, default=GRADIO_WORKER_THREADS)
+    parser.add_argument("--out", help="write results as JSON")
+    args = parser.parse_args()
+
+    # Measure the UI runtime, not provider limits or cache hits
+    search_cache.enabled = False
+    report_cache.enabled = False
+    checkpoints.enabled = False
+    # Fake URLs go to a throwaway store, not the app's .cache/sources.sqlite3
+    source_store.path = f"{tempfile.mkdtemp(prefix='bench-')}/sources.sqlite3"
+    scheduler.max_concurrency = 1_000_000
+    scheduler.requests = TokenBucket(1e9)
+    scheduler.tokens = TokenBucket(1e12)
+
+    with fake_runner.install(fake_runner.FakeRunner(scale=args.scale)):
+        results = [bench_legacy(args.sessions, args.workers), bench_shared(args.sessions, args.limit)]
+
+    for r in results:
+        print(f"{r['mode']:<28} {r['sessions_per_s']:>8} sessions/s  "
+              f"peak {r['peak_concurrent_sessions']:>4} concurrent  {r['peak_threads']:>4} threads  "
+              f"({r['wall_s']}s wall)")
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Startup benchmark: import time, time until the UI can serve, and time to the
+first research request, each measured in a fresh interpreter. fake_runner answers
+the model calls, so no API calls are made.
+
+Modes:
+  eager  everything loaded up front, as app.py used to (gradio, pipeline, UI)
+  cold   lazy app; the first request arrives as soon as the UI is up and loads the pipeline
+  warm   lazy app; warm_up() runs after the UI is up, before the first request
+
+    python bench_startup.py --runs 5 --out bench_startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+MODES = ("eager", "cold", "warm")
+QUERY = "Exciting commercial applications of agentic AI as of August 2025"
+
+
+def child(mode: str, scale: float) -> dict:
+    """One startup in this interpreter; seconds since the first import."""
+    start = time.perf_counter()
+    timings = {}
+    import app
+    if mode == "eager":
+        import gradio  # noqa: F401
+        import run_registry  # noqa: F401
+    timings["import_s"] = time.perf_counter() - start
+    app.get_demo()
+    timings["ready_s"] = time.perf_counter() - start
+    if mode == "warm":
+        timings["warm_up_s"] = app.warm_up()
+
+    async def request():
+        first = None
+        async for _ in app.stream(QUERY):
+            first = first or time.perf_counter()
+        return first
+
+    # fake_runner imports the scheduler and the agents SDK, which a cold request loads anyway
+    requested = time.perf_counter()
+    import asyncio
+    import fake_runner
+
+    with fake_runner.install(fake_runner.FakeRunner(scale=scale)):
+        first = asyncio.run(request())
+    done = time.perf_counter()
+    timings["first_chunk_s"] = first - requested
+    timings["request_s"] = done - requested
+    timings["total_s"] = done - start
+    return timings
+
+
+def run(mode: str, scale: float) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {
+            **os.environ,
+            "SEARCH_CACHE_PATH": os.path.join(tmp, "search.sqlite3"),
+            "REPORT_CACHE_PATH": os.path.join(tmp, "reports.sqlite3"),
+            "SOURCE_STORE_PATH": os.path.join(tmp, "sources.sqlite3"),
+            "RUN_CHECKPOINTS": "0",
+            "REPORT_CACHE": "0",
+            "GRADIO_ANALYTICS_ENABLED": "False",
+        }
+        out = subprocess.run(
+            [sys.executable, __file__, "--child", mode, "--scale", str(scale)],
+            env=env, capture_output=True, text=True, check=True,
+        ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3, help="fresh interpreters per mode (median reported)")
+    parser.add_argument("--scale", type=float, default=0.0, help="multiplier on simulated model latency")
+    parser.add_argument("--modes", default=",".join(MODES))
+    parser.add_argument("--out", help="write results as JSON")
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(child(args.child, args.scale)))
+        return
+
+    results = []
+    for mode in args.modes.split(","):
+        samples = [run(mode, args.scale) for _ in range(args.runs)]
+        row = {"mode": mode, "runs": args.runs}
+        for key in samples[0]:
+            row[key] = round(statistics.median(s[key] for s in samples), 3)
+        results.append(row)
+        print(f"{mode:<6} import {row['import_s']:>6.2f}s  ready {row['ready_s']:>6.2f}s  "
+              f"first chunk {row['first_chunk_s']:>6.2f}s  request {row['request_s']:>6.2f}s  "
+              f"(warm-up {row.get('warm_up_s', 0):.2f}s, total {row['total_s']:.2f}s)")
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
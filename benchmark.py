@@ -0,0 +1,165 @@
+"""
+Offline benchmark of the research pipeline's orchestration.
+
+Runs full ResearchManager.run pipelines against fake_runner (canned outputs,
+seeded latency distributions and failure injection; no API calls) at one or more
+concurrency levels, and writes end-to-end and per-stage latency percentiles,
+throughput, error counts and peak memory to a JSON file for run-to-run comparison.
+
+    python benchmark.py --concurrency 1,8,32 --runs 64 --scale 0.05 --sigma 0.5 --failure-rate 0.05
+"""
+import argparse
+import asyncio
+import json
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import fake_runner
+from research_manager import ResearchManager
+from scheduler import TokenBucket, scheduler
+from model_router import router
+from report_cache import report_cache
+from checkpoints import checkpoints
+from search_cache import search_cache
+from source_store import source_store
+
+
+def percentiles(values: list[float]) -> dict:
+    if not values:
+        return {}
+    v = sorted(values)
+    pick = lambda q: v[min(len(v) - 1, int(q * len(v)))]
+    return {"p50": pick(0.50), "p90": pick(0.90), "p95": pick(0.95), "max": v[-1], "mean": sum(v) / len(v)}
+
+
+async def bench_level(concurrency: int, runs: int, stream_report: bool, adaptive: bool = False,
+                      pipeline: bool = False) -> dict:
+    sem = asyncio.Semaphore(concurrency)
+    e2e: list[float] = []
+    stages: dict[str, list[float]] = {}
+    errors: dict[str, int] = {}
+    tokens = {"input": 0, "cached": 0}
+
+    async def one(i: int):
+        async with sem:
+            rm = ResearchManager(stream_report=stream_report, adaptive=adaptive, pipeline_writing=pipeline)
+            start = time.perf_counter()
+            try:
+                async for _ in rm.run(f"benchmark query {concurrency}-{i}"):
+                    pass
+            except Exception as e:
+                errors[e.__class__.__name__] = errors.get(e.__class__.__name__, 0) + 1
+                return
+            e2e.append(time.perf_counter() - start)
+            for stage, seconds in rm.timings.items():
+                stages.setdefault(stage, []).append(seconds)
+            summary = rm.metrics.summary()
+            tokens["input"] += summary["input_tokens"]
+            tokens["cached"] += summary["cached_tokens"]
+
+    tracemalloc.reset_peak()
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(runs)))
+    wall = time.perf_counter() - start
+    return {
+        "concurrency": concurrency,
+        "runs": runs,
+        "completed": len(e2e),
+        "errors": errors,
+        "wall_s": wall,
+        "throughput_runs_per_s": len(e2e) / wall if wall else 0.0,
+        "e2e_s": percentiles(e2e),
+        "stage_s": {stage: percentiles(v) for stage, v in stages.items()},
+        "input_tokens": tokens["input"],
+        "cached_ratio": tokens["cached"] / tokens["input"] if tokens["input"] else 0.0,
+        "peak_traced_mb": tracemalloc.get_traced_memory()[1] / 2**20,
+    }
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", default="1,8,32", help="comma-separated concurrent-run levels")
+    parser.add_argument("--runs", type=int, default=32, help="pipelines per level")
+    parser.add_argument("--scale", type=float, default=0.05, help="multiplier on fake_runner.DEFAULT_LATENCY")
+    parser.add_argument("--sigma", type=float, default=0.5, help="log-normal latency spread")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="chance each model call raises a 429")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--backoff-base", type=float, default=0.05, help="scheduler retry backoff base (s)")
+    parser.add_argument("--no-stream", action="store_true", help="benchmark the non-streaming writer path")
+    parser.add_argument("--no-hedge", action="store_true", help="disable hedged planner/search calls")
+    parser.add_argument("--adaptive", action="store_true", help="benchmark adaptive multi-round research")
+    parser.add_argument("--pipeline", action="store_true", help="draft while searching, merge later results during evaluation")
+    parser.add_argument("--out", default="bench_results.json")
+    args = parser.parse_args()
+
+    # Measure orchestration, not provider budgets or cache hits
+    search_cache.enabled = False
+    report_cache.enabled = False
+    checkpoints.enabled = False
+    # Fake URLs go to a throwaway store, not the app's .cache/sources.sqlite3
+    source_store.path = f"{tempfile.mkdtemp(prefix='bench-')}/sources.sqlite3"
+    scheduler.max_concurrency = 1_000_000
+    scheduler.requests = TokenBucket(1e9)
+    scheduler.tokens = TokenBucket(1e12)
+    scheduler.backoff_base = args.backoff_base
+    scheduler.backoff_max = args.backoff_base * 16
+    router.hedge_min_delay = 0.0  # fake latencies are scaled down
+    if args.no_hedge:
+        router.hedge_stages = frozenset()
+
+    runner = fake_runner.FakeRunner(scale=args.scale, sigma=args.sigma,
+                                    failure_rate=args.failure_rate, seed=args.seed)
+    levels = [int(c) for c in args.concurrency.split(",")]
+
+    async def run_all():
+        return [await bench_level(c, args.runs, not args.no_stream, args.adaptive, args.pipeline) for c in levels]
+
+    tracemalloc.start()
+    with fake_runner.install(runner):
+        results = asyncio.run(run_all())
+    tracemalloc.stop()
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "commit": git_commit(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "args": vars(args),
+            "fake_calls": runner.calls,
+            "fake_failures": runner.failures,
+            "scheduler": scheduler.stats(),
+            "router": router.stats(),
+            "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        },
+        "levels": results,
+    }
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+
+    for r in results:
+        e2e = r["e2e_s"]
+        print(f"c={r['concurrency']:<4} {r['completed']}/{r['runs']} ok  "
+              f"{r['throughput_runs_per_s']:.2f} runs/s  "
+              f"e2e p50 {e2e.get('p50', 0):.3f}s p95 {e2e.get('p95', 0):.3f}s  "
+              f"cached input {r['cached_ratio']:.0%}  "
+              f"peak {r['peak_traced_mb']:.1f} MB")
+    print(f"Wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
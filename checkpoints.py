@@ -0,0 +1,81 @@
+"""
+Per-run stage checkpoints, so a run interrupted by a restart resumes from its last
+completed stage instead of starting over.
+
+One JSON file per question (report_cache.query_key) under RUN_CHECKPOINT_DIR holds
+the outputs of the stages finished so far (plan, search, draft, eval) and the
+research round they belong to. Saving a stage drops any later ones (they were built from older inputs);
+the file is removed when the run completes. Writes are atomic (temp file + rename).
+"""
+import hashlib
+import json
+import os
+import time
+
+from report_cache import query_key
+
+RUN_CHECKPOINTS = os.getenv("RUN_CHECKPOINTS", "1") != "0"
+RUN_CHECKPOINT_DIR = os.getenv("RUN_CHECKPOINT_DIR", ".cache/runs")
+RUN_CHECKPOINT_TTL = float(os.getenv("RUN_CHECKPOINT_TTL", str(6 * 3600)))  # seconds
+
+STAGES = ("plan", "search", "draft", "eval")
+
+
+class CheckpointStore:
+    def __init__(self, directory: str = RUN_CHECKPOINT_DIR, ttl: float = RUN_CHECKPOINT_TTL,
+                 enabled: bool = RUN_CHECKPOINTS):
+        self.directory = directory
+        self.ttl = ttl
+        self.enabled = enabled
+
+    def _path(self, query: str) -> str:
+        key = hashlib.sha256(query_key(query).encode()).hexdigest()[:24]
+        return os.path.join(self.directory, f"{key}.json")
+
+    def load(self, query: str) -> dict:
+        """{"round": n, "stages": {stage: value}} for a fresh checkpoint, else {}."""
+        if not self.enabled:
+            return {}
+        try:
+            with open(self._path(query), encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            print(f"Ignoring unreadable checkpoint for {query!r}: {e}")
+            return {}
+        if time.time() - data.get("updated_at", 0) > self.ttl:
+            self.clear(query)
+            return {}
+        return data
+
+    def save(self, query: str, stage: str, value, round: int = 1) -> None:
+        if not self.enabled:
+            return
+        data = self.load(query) or {"query": query, "stages": {}}
+        later = STAGES[STAGES.index(stage) + 1:]
+        data["stages"] = {k: v for k, v in data["stages"].items() if k not in later}
+        data["stages"][stage] = value
+        data["round"] = round
+        data["updated_at"] = time.time()
+        path = self._path(query)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp, path)
+        except Exception as e:
+            print(f"Checkpoint write failed: {e}")
+
+    def clear(self, query: str) -> None:
+        try:
+            os.remove(self._path(query))
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Checkpoint delete failed: {e}")
+
+
+# Shared by every ResearchManager in the process
+checkpoints = CheckpointStore()
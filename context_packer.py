@@ -0,0 +1,184 @@
+"""
+Packs search summaries into the writer's prompt: splits them into sentences,
+drops near-duplicate sentences across summaries (word-shingle MinHash), ranks the
+rest by relevance to the query (BM25) and keeps as many as fit a token budget.
+
+Notes carry inline [n] markers where a source is cited. Every kept line ends with
+the [n] numbers of its own markers (or its note's sources when it has none), plus
+those of any duplicates merged into it, so citations line up with the numbered
+sources list.
+
+The same notes are packed again for every section revision and merge, so each
+sentence's cleanup, token count and MinHash signature are computed once per
+process (LRU-cached on its text) rather than once per pack: this is pure-Python
+work on the event loop shared by every session.
+"""
+import functools
+import hashlib
+import math
+import os
+import random
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+
+WRITER_CONTEXT_TOKENS = int(os.getenv("WRITER_CONTEXT_TOKENS", "3000"))
+CONTEXT_DEDUP_THRESHOLD = float(os.getenv("CONTEXT_DEDUP_THRESHOLD", "0.7"))
+# Sentences whose parsed form and MinHash signature are kept between packs
+CONTEXT_CACHE_SENTENCES = int(os.getenv("CONTEXT_CACHE_SENTENCES", "20000"))
+
+_SENT_SPLIT = re.compile(r"(?<=[.!?])\s+|\n+")
+_WORD = re.compile(r"\w+")
+_BULLET = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s+")
+_MARKER = re.compile(r"\s*\[(\d+)\]")
+_SPACE_BEFORE_PUNCT = re.compile(r"\s+([.,;:!?])")
+
+_NUM_PERM = 64
+_BANDS, _ROWS = 16, 4  # _BANDS * _ROWS == _NUM_PERM
+_PRIME = (1 << 61) - 1
+_rng = random.Random(1729)
+_PERMS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(_NUM_PERM)]
+
+_encoding = None
+
+
+def count_tokens(text: str) -> int:
+    """o200k_base token count (gpt-4o family) when tiktoken is available, else ~4 chars per token."""
+    global _encoding
+    if _encoding is None:
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("o200k_base")
+        except Exception:  # tiktoken missing or its encoding can't be fetched
+            _encoding = False
+    return len(_encoding.encode(text)) if _encoding else max(1, len(text) // 4)
+
+
+@dataclass
+class _Sentence:
+    text: str
+    note: int  # index of the note it came from
+    position: int  # index within its note
+    words: tuple[str, ...]
+    tokens: int
+    signature: tuple[int, ...]
+    sources: list[int] = field(default_factory=list)
+    score: float = 0.0
+
+
+@dataclass
+class PackedContext:
+    text: str
+    tokens: int
+    kept: int
+    duplicates: int
+    over_budget: int
+
+
+def _signature(words: tuple[str, ...]) -> tuple[int, ...]:
+    shingles = {" ".join(words[i:i + 3]) for i in range(max(1, len(words) - 2))}
+    hashes = [int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), "big") for s in shingles]
+    return tuple(min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMS)
+
+
+def _similarity(a: tuple[int, ...], b: tuple[int, ...]) -> float:
+    return sum(x == y for x, y in zip(a, b)) / _NUM_PERM
+
+
+@functools.lru_cache(maxsize=CONTEXT_CACHE_SENTENCES)
+def _parse(raw: str) -> tuple[str, tuple[int, ...], tuple[str, ...], int, tuple[int, ...]] | None:
+    """A raw sentence's clean text, cited [n], words, tokens and signature; None if too short."""
+    cited = tuple(dict.fromkeys(int(n) for n in _MARKER.findall(raw)))
+    text = _SPACE_BEFORE_PUNCT.sub(r"\1", _MARKER.sub("", _BULLET.sub("", raw))).strip()
+    words = tuple(_WORD.findall(text.lower()))
+    if len(words) < 3:
+        return None  # headings, fragments
+    return text, cited, words, count_tokens(text), _signature(words)
+
+
+def _split(notes: list[tuple[list[int], str]]) -> list[_Sentence]:
+    sentences = []
+    for note, (default_sources, text) in enumerate(notes):
+        for position, raw in enumerate(s for s in _SENT_SPLIT.split(text or "") if s.strip()):
+            parsed = _parse(raw)
+            if parsed is None:
+                continue
+            clean, cited, words, tokens, signature = parsed
+            sentences.append(_Sentence(clean, note, position, words, tokens, signature,
+                                       list(cited) or list(default_sources)))
+    return sentences
+
+
+def _score(query: str, sentences: list[_Sentence]) -> None:
+    """BM25 of each sentence against the query, plus a small lead-sentence prior."""
+    terms = set(_WORD.findall(query.lower()))
+    n = len(sentences)
+    df = Counter(w for s in sentences for w in set(s.words))
+    avg_len = sum(len(s.words) for s in sentences) / n
+    k1, b = 1.2, 0.75
+    for s in sentences:
+        tf = Counter(s.words)
+        bm25 = 0.0
+        for t in terms & tf.keys():
+            idf = math.log(1 + (n - df[t] + 0.5) / (df[t] + 0.5))
+            bm25 += idf * tf[t] * (k1 + 1) / (tf[t] + k1 * (1 - b + b * len(s.words) / avg_len))
+        s.score = bm25 + 0.5 / (1 + s.position)
+
+
+def pack_context(query: str, notes: list[tuple[list[int], str]], budget: int = WRITER_CONTEXT_TOKENS,
+                 threshold: float = CONTEXT_DEDUP_THRESHOLD) -> PackedContext:
+    """
+    notes: (source numbers, summary text) pairs, one per search; the numbers apply
+      to sentences of the text without an inline [n] marker of their own.
+    Returns one "- sentence [n][m]" line per kept sentence, grouped by note in
+    original order, within `budget` tokens.
+    """
+    sentences = _split(notes)
+    if not sentences:
+        return PackedContext("", 0, 0, 0, 0)
+    _score(query, sentences)
+    ranked = sorted(sentences, key=lambda s: -s.score)
+
+    # Near-duplicate removal via LSH banding; the higher-ranked sentence survives
+    # and inherits the duplicate's source numbers.
+    buckets: dict[tuple, list[tuple[_Sentence, tuple]]] = {}
+    unique: list[_Sentence] = []
+    duplicates = 0
+    for s in ranked:
+        sig = s.signature
+        bands = [(i, sig[i * _ROWS:(i + 1) * _ROWS]) for i in range(_BANDS)]
+        match = None
+        for band in bands:
+            for other, other_sig in buckets.get(band, ()):
+                if _similarity(sig, other_sig) >= threshold:
+                    match = other
+                    break
+            if match:
+                break
+        if match:
+            duplicates += 1
+            match.sources += [n for n in s.sources if n not in match.sources]
+            continue
+        unique.append(s)
+        for band in bands:
+            buckets.setdefault(band, []).append((s, sig))
+
+    # Every note keeps its best sentence first, then the rest by relevance
+    leads: dict[int, _Sentence] = {}
+    for s in unique:
+        leads.setdefault(s.note, s)
+    lead_ids = {id(s) for s in leads.values()}
+    chosen = list(leads.values()) + [s for s in unique if id(s) not in lead_ids]
+
+    kept, used = [], 0
+    for s in chosen:
+        cost = s.tokens + 2 * len(s.sources) + 2
+        if used + cost > budget:
+            continue
+        kept.append(s)
+        used += cost
+
+    kept.sort(key=lambda s: (s.note, s.position))
+    lines = [f"- {s.text} " + "".join(f"[{n}]" for n in sorted(s.sources)) for s in kept]
+    lines = [line.rstrip() for line in lines]
+    return PackedContext("\n".join(lines), used, len(kept), duplicates, len(unique) - len(kept))
@@ -0,0 +1,85 @@
+"""
+Adaptive (iterative-deepening) research: how many searches to plan for a query, and
+which sub-questions are still uncovered after a round.
+
+Round 1 plans plan_size(query) searches. After each write + evaluate, the writer's
+follow_up_questions and the headings of sections that still fail are the candidate
+sub-questions; those the notes don't already cover become the next round's searches,
+until RESEARCH_COVERAGE_TARGET of the candidates are covered, RESEARCH_SEARCH_BUDGET
+searches have been spent or RESEARCH_MAX_ROUNDS rounds have run.
+"""
+import math
+import os
+import re
+from dataclasses import asdict, dataclass, field
+
+RESEARCH_ADAPTIVE = os.getenv("RESEARCH_ADAPTIVE", "0") == "1"
+RESEARCH_SEARCH_BUDGET = int(os.getenv("RESEARCH_SEARCH_BUDGET", "12"))
+RESEARCH_MAX_ROUNDS = int(os.getenv("RESEARCH_MAX_ROUNDS", "3"))
+RESEARCH_MIN_SEARCHES = int(os.getenv("RESEARCH_MIN_SEARCHES", "2"))
+RESEARCH_MAX_SEARCHES = int(os.getenv("RESEARCH_MAX_SEARCHES", "8"))
+RESEARCH_COVERAGE_TARGET = float(os.getenv("RESEARCH_COVERAGE_TARGET", "0.8"))
+# A sub-question counts as covered when this fraction of its content words appear in the notes
+GAP_COVERED = 0.6
+
+_WORD = re.compile(r"\w+")
+_FACET = re.compile(r"\b(?:and|vs|versus|compared?|comparison|between|impact|trade-?offs?)\b|[,;?]")
+_STOPWORDS = frozenset("""
+a an and are as at be by can could do does for from how i in into is it its me my of on or
+please should tell than that the their there these this to was what when where which who why
+will with would you your about give explain describe most more some any other been being has have
+""".split())
+
+
+def content_words(text: str) -> list[str]:
+    return [w for w in _WORD.findall(text.lower()) if w not in _STOPWORDS and len(w) > 2]
+
+
+def plan_size(query: str, budget: int = RESEARCH_SEARCH_BUDGET) -> int:
+    """Searches for round 1: grows with the query's length and number of facets, within budget."""
+    words = len(content_words(query))
+    facets = len(_FACET.findall(query.lower().rstrip(" ?")))
+    size = RESEARCH_MIN_SEARCHES + math.ceil(words / 6) + facets
+    return max(1, min(size, RESEARCH_MAX_SEARCHES, budget))
+
+
+def _covered(question: str, vocabulary: set[str]) -> bool:
+    # 5-character prefixes absorb inflection ("guardrail" / "guardrails", "adopted" / "adoption")
+    words = {w[:5] for w in content_words(question)}
+    return not words or len(words & vocabulary) / len(words) >= GAP_COVERED
+
+
+def find_gaps(candidates: list[str], notes_text: str, searched: set[str]) -> tuple[list[str], float]:
+    """
+    Uncovered candidate sub-questions not searched yet, and the fraction of
+    candidates the notes already cover (1.0 when there are none).
+    """
+    vocabulary = {w[:5] for w in content_words(notes_text)}
+    seen: set[str] = set()
+    unique = []
+    for c in candidates:
+        key = " ".join(sorted(set(content_words(c))))
+        if key and key not in seen:
+            seen.add(key)
+            unique.append(c)
+    if not unique:
+        return [], 1.0
+    uncovered = [c for c in unique if not _covered(c, vocabulary)]
+    gaps = [c for c in uncovered if c.strip().lower() not in searched]
+    return gaps, 1 - len(uncovered) / len(unique)
+
+
+@dataclass
+class RoundStats:
+    round: int
+    searches: int  # searches run this round (cache hits included)
+    succeeded: int
+    sources: int  # cited sources after the round
+    new_sources: int
+    seconds: float
+    overall: float | None = None  # eval score of the report written from this round's notes
+    coverage: float | None = None  # fraction of candidate sub-questions covered
+    gaps: list[str] = field(default_factory=list)  # uncovered sub-questions found after this round
+
+    def as_dict(self) -> dict:
+        return asdict(self)
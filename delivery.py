@@ -0,0 +1,307 @@
+"""
+Asynchronous, batched email delivery.
+
+DeliveryQueue.send() enqueues a message and waits for its outcome. A worker
+collects up to DELIVERY_BATCH_SIZE messages (or whatever arrived within
+DELIVERY_BATCH_WAIT_S) and hands them to the transport as one batch; failed
+messages are retried with jittered exponential backoff, up to DELIVERY_MAX_RETRIES.
+
+Transports keep one client or connection for the life of the queue:
+  sendgrid  SendGrid v3 API over a pooled httpx.AsyncClient; messages with the
+            same subject and body go out as one request with a personalization each
+  smtp      smtplib on a single worker thread, one connection reused across batches
+            (point SMTP_HOST/SMTP_PORT at a local stand-in such as
+            `python -m aiosmtpd -n -l localhost:1025` for testing)
+"""
+import asyncio
+import os
+import random
+import smtplib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from email.message import EmailMessage
+
+import httpx
+
+EMAIL_TRANSPORT = os.getenv("EMAIL_TRANSPORT", "sendgrid")  # sendgrid | smtp
+SENDER_EMAIL = os.getenv("SENDER_EMAIL")
+RECIPIENT_EMAIL = os.getenv("RECIPIENT_EMAIL")
+SENDGRID_API_KEY = os.getenv("SENDGRID_API_KEY")
+SENDGRID_URL = os.getenv("SENDGRID_URL", "https://api.sendgrid.com/v3/mail/send")
+SMTP_HOST = os.getenv("SMTP_HOST", "localhost")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "1025"))
+SMTP_USER = os.getenv("SMTP_USER")
+SMTP_PASSWORD = os.getenv("SMTP_PASSWORD")
+SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "0") == "1"
+DELIVERY_BATCH_SIZE = int(os.getenv("DELIVERY_BATCH_SIZE", "50"))
+DELIVERY_BATCH_WAIT_S = float(os.getenv("DELIVERY_BATCH_WAIT_S", "1.0"))
+DELIVERY_CONCURRENCY = int(os.getenv("DELIVERY_CONCURRENCY", "4"))  # batches in flight
+DELIVERY_MAX_RETRIES = int(os.getenv("DELIVERY_MAX_RETRIES", "5"))
+DELIVERY_BACKOFF_BASE_S = float(os.getenv("DELIVERY_BACKOFF_BASE_S", "1.0"))
+DELIVERY_BACKOFF_MAX_S = float(os.getenv("DELIVERY_BACKOFF_MAX_S", "60"))
+
+# SendGrid personalizations per request
+SENDGRID_MAX_RECIPIENTS = 1000
+
+_STOP = object()
+
+
+@dataclass
+class Email:
+    to: str
+    subject: str
+    html: str
+    text: str = ""
+
+
+class DeliveryError(Exception):
+    def __init__(self, message: str, retryable: bool = False):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+def _retryable(exc: BaseException) -> bool:
+    if isinstance(exc, DeliveryError):
+        return exc.retryable
+    # Connection drops and timeouts, from either transport
+    return isinstance(exc, (httpx.TransportError, smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError))
+
+
+class SendGridTransport:
+    def __init__(self, api_key: str | None = SENDGRID_API_KEY, sender: str | None = SENDER_EMAIL,
+                 url: str = SENDGRID_URL):
+        if not api_key or not sender:
+            raise DeliveryError("SENDGRID_API_KEY and SENDER_EMAIL must be set for the sendgrid transport")
+        self.sender = sender
+        self.url = url
+        self._client = httpx.AsyncClient(headers={"Authorization": f"Bearer {api_key}"}, timeout=30)
+
+    async def _post(self, group: list[Email]) -> None:
+        first = group[0]
+        content = ([{"type": "text/plain", "value": first.text}] if first.text else []) + \
+            [{"type": "text/html", "value": first.html}]
+        response = await self._client.post(self.url, json={
+            "personalizations": [{"to": [{"email": m.to}]} for m in group],
+            "from": {"email": self.sender},
+            "subject": first.subject,
+            "content": content,
+        })
+        if response.status_code >= 300:
+            retryable = response.status_code in (408, 429) or response.status_code >= 500
+            raise DeliveryError(f"SendGrid returned {response.status_code}: {response.text[:200]}", retryable)
+
+    async def send_batch(self, messages: list[Email]) -> list[BaseException | None]:
+        groups: dict[tuple, list[int]] = {}
+        for i, m in enumerate(messages):
+            groups.setdefault((m.subject, m.html, m.text), []).append(i)
+        chunks = [idx[k:k + SENDGRID_MAX_RECIPIENTS] for idx in groups.values()
+                  for k in range(0, len(idx), SENDGRID_MAX_RECIPIENTS)]
+        outcomes = await asyncio.gather(*(self._post([messages[i] for i in chunk]) for chunk in chunks),
+                                        return_exceptions=True)
+        results: list[BaseException | None] = [None] * len(messages)
+        for chunk, outcome in zip(chunks, outcomes):
+            for i in chunk:
+                results[i] = outcome
+        return results
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+class SMTPTransport:
+    def __init__(self, host: str = SMTP_HOST, port: int = SMTP_PORT, sender: str | None = SENDER_EMAIL,
+                 user: str | None = SMTP_USER, password: str | None = SMTP_PASSWORD,
+                 starttls: bool = SMTP_STARTTLS):
+        self.host, self.port = host, port
+        self.sender = sender or f"research@{host}"
+        self.user, self.password, self.starttls = user, password, starttls
+        self._conn: smtplib.SMTP | None = None
+        # smtplib is blocking and not thread-safe: one thread owns the connection
+        self._thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix="smtp")
+
+    def _connection(self) -> smtplib.SMTP:
+        if self._conn is not None:
+            try:
+                if self._conn.noop()[0] == 250:
+                    return self._conn
+            except smtplib.SMTPException:
+                pass
+            self._conn = None
+        conn = smtplib.SMTP(self.host, self.port, timeout=30)
+        if self.starttls:
+            conn.starttls()
+        if self.user:
+            conn.login(self.user, self.password or "")
+        self._conn = conn
+        return conn
+
+    def _send_all(self, messages: list[Email]) -> list[BaseException | None]:
+        results: list[BaseException | None] = []
+        for m in messages:
+            msg = EmailMessage()
+            msg["From"], msg["To"], msg["Subject"] = self.sender, m.to, m.subject
+            msg.set_content(m.text or "This report is best viewed as HTML.")
+            msg.add_alternative(m.html, subtype="html")
+            try:
+                self._connection().send_message(msg)
+                results.append(None)
+            except smtplib.SMTPRecipientsRefused as e:
+                results.append(DeliveryError(f"SMTP refused {m.to}: {e.recipients}"))
+            except smtplib.SMTPResponseException as e:
+                # 4xx is transient (greylisting, rate limits); 5xx is permanent for this message
+                results.append(DeliveryError(f"SMTP {e.smtp_code}: {e.smtp_error!r}", retryable=400 <= e.smtp_code < 500))
+            except (smtplib.SMTPException, OSError) as e:
+                self._conn = None
+                results.append(DeliveryError(f"SMTP send failed: {e}", retryable=True))
+        return results
+
+    async def send_batch(self, messages: list[Email]) -> list[BaseException | None]:
+        return await asyncio.get_running_loop().run_in_executor(self._thread, self._send_all, messages)
+
+    def _quit(self) -> None:
+        if self._conn is not None:
+            try:
+                self._conn.quit()
+            except smtplib.SMTPException:
+                pass
+            self._conn = None
+
+    async def close(self) -> None:
+        await asyncio.get_running_loop().run_in_executor(self._thread, self._quit)
+        self._thread.shutdown(wait=False)
+
+
+def make_transport(name: str = EMAIL_TRANSPORT):
+    if name == "sendgrid":
+        return SendGridTransport()
+    if name == "smtp":
+        return SMTPTransport()
+    raise ValueError(f"EMAIL_TRANSPORT must be 'sendgrid' or 'smtp', got {name!r}")
+
+
+class DeliveryQueue:
+    """
+    Batches and retries sends on the event loop it is first used from. Pass a
+    transport (anything with async send_batch(list[Email]) -> per-message errors
+    and async close()) or let it build one from EMAIL_TRANSPORT on first send.
+    """
+
+    def __init__(
+        self,
+        transport=None,
+        batch_size: int = DELIVERY_BATCH_SIZE,
+        batch_wait: float = DELIVERY_BATCH_WAIT_S,
+        concurrency: int = DELIVERY_CONCURRENCY,
+        max_retries: int = DELIVERY_MAX_RETRIES,
+        backoff_base: float = DELIVERY_BACKOFF_BASE_S,
+        backoff_max: float = DELIVERY_BACKOFF_MAX_S,
+    ):
+        self.transport = transport
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._concurrency = concurrency
+        self._owns_transport = False
+        self._queue: asyncio.Queue | None = None
+        self._worker: asyncio.Task | None = None
+        self._batches: set[asyncio.Task] = set()
+        self.sent = 0
+        self.failed = 0
+        self.retries = 0
+        self.batches = 0
+
+    def _start(self) -> None:
+        if self._worker is None or self._worker.done():
+            if self.transport is None:
+                self.transport = make_transport()
+                self._owns_transport = True
+            self._queue = asyncio.Queue()
+            self._slots = asyncio.Semaphore(self._concurrency)
+            self._worker = asyncio.create_task(self._run())
+
+    async def send(self, message: Email) -> None:
+        """Deliver one message; raises DeliveryError once retries are exhausted."""
+        self._start()
+        done = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((message, done))
+        await done
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is _STOP:
+                return
+            batch = [item]
+            deadline = loop.time() + self.batch_wait
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._slots.acquire()
+            task = asyncio.create_task(self._deliver(batch))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+
+    async def _deliver(self, batch: list[tuple[Email, asyncio.Future]]) -> None:
+        try:
+            pending = batch
+            for attempt in range(self.max_retries + 1):
+                self.batches += 1
+                try:
+                    results = await self.transport.send_batch([m for m, _ in pending])
+                except Exception as e:
+                    results = [e] * len(pending)
+                retry = []
+                for (message, done), error in zip(pending, results):
+                    if done.done():
+                        continue  # the sender gave up waiting
+                    if error is None:
+                        self.sent += 1
+                        done.set_result(None)
+                    elif attempt < self.max_retries and _retryable(error):
+                        retry.append((message, done))
+                    else:
+                        self.failed += 1
+                        done.set_exception(error if isinstance(error, DeliveryError)
+                                           else DeliveryError(f"{error.__class__.__name__}: {error}"))
+                if not retry:
+                    return
+                self.retries += len(retry)
+                cap = min(self.backoff_max, self.backoff_base * 2 ** attempt)
+                delay = random.uniform(cap / 2, cap)
+                print(f"Retrying {len(retry)} email(s) in {delay:.1f}s (attempt {attempt + 1}/{self.max_retries})")
+                await asyncio.sleep(delay)
+                pending = retry
+        finally:
+            self._slots.release()
+
+    async def close(self) -> None:
+        """Finish queued sends, then stop the worker and close the transport."""
+        if self._worker is None:
+            return
+        self._queue.put_nowait(_STOP)
+        await self._worker
+        await asyncio.gather(*self._batches, return_exceptions=True)
+        await self.transport.close()
+        self._worker = None
+        self.transport = None if self._owns_transport else self.transport
+
+    def stats(self) -> dict:
+        return {"sent": self.sent, "failed": self.failed, "retries": self.retries, "batches": self.batches,
+                "queued": self._queue.qsize() if self._queue else 0}
+
+
+# Shared by every sender in the process so batches and the transport connection are shared
+delivery_queue = DeliveryQueue()
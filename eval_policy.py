@@ -0,0 +1,47 @@
+"""
+How evaluate_and_maybe_revise spends judge and revision calls on each section.
+
+  fast_fail    A section that already fails the deterministic gate (citation
+               coverage) is revised at once, without waiting on the judge.
+  final        Re-judge revised sections: "always", "sample" (a `final_sample`
+               fraction of them) or "skip" (deterministic checks only).
+  speculative  Start a revision alongside the judge call; keep it if the judge
+               fails the section, cancel it if the judge passes.
+"""
+import os
+import random
+from dataclasses import dataclass, field
+
+EVAL_FAST_FAIL = os.getenv("EVAL_FAST_FAIL", "1") != "0"
+EVAL_FINAL = os.getenv("EVAL_FINAL", "always")
+EVAL_FINAL_SAMPLE = float(os.getenv("EVAL_FINAL_SAMPLE", "0.25"))
+EVAL_SPECULATIVE = os.getenv("EVAL_SPECULATIVE", "0") == "1"
+
+FINAL_MODES = ("always", "sample", "skip")
+
+
+@dataclass
+class EvalPolicy:
+    fast_fail: bool = EVAL_FAST_FAIL
+    final: str = EVAL_FINAL
+    final_sample: float = EVAL_FINAL_SAMPLE
+    speculative: bool = EVAL_SPECULATIVE
+    seed: int | None = None
+    _rng: random.Random = field(init=False, repr=False)
+
+    def __post_init__(self):
+        if self.final not in FINAL_MODES:
+            raise ValueError(f"EVAL_FINAL must be one of {FINAL_MODES}, got {self.final!r}")
+        self._rng = random.Random(self.seed)
+
+    def rescore(self) -> bool:
+        """Whether to re-judge one revised section."""
+        if self.final == "always":
+            return True
+        if self.final == "sample":
+            return self._rng.random() < self.final_sample
+        return False
+
+
+# Default policy for every ResearchManager, from the environment
+eval_policy = EvalPolicy()
@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 from pydantic import BaseModel, Field, conlist
 
 class EvalCriterionScore(BaseModel):
@@ -6,9 +6,24 @@ class EvalCriterionScore(BaseModel):
     score: float = Field(..., ge=1, le=5, description="Score 1-5")
     justification: str = Field(..., description="One concise sentence explaining the score")
 
-class EvaluationReport(BaseModel):
+class JudgeScores(BaseModel):
+    """What the LLM judge returns for one answer (a whole report or a single section)."""
     # v2 uses min_length / max_length (not min_items / max_items)
     criteria: conlist(EvalCriterionScore, min_length=3, max_length=6)
     overall: float = Field(..., ge=1, le=5, description="Weighted average 1–5")
     # <-- add this:
     recommendations: List[str] = Field(default_factory=list, description="Actionable fixes")
+
+class SectionScore(BaseModel):
+    heading: str = Field(..., description="Section heading ('' for text before the first heading)")
+    words: int = Field(..., ge=0)
+    coverage: float = Field(..., ge=0, le=1, description="Fraction of sentences with [n] citations")
+    invalid_citations: List[int] = Field(default_factory=list, description="[n] that match no source")
+    overall: Optional[float] = Field(None, ge=1, le=5, description="Judge score; None if too short to judge")
+    recommendations: List[str] = Field(default_factory=list)
+    passed: bool = True
+    revised: bool = False
+
+class EvaluationReport(JudgeScores):
+    """Report-level scores aggregated (word-weighted) from the per-section scores."""
+    sections: List[SectionScore] = Field(default_factory=list, description="Per-section scores")
@@ -1,13 +1,14 @@
-from agents import Agent
-from eval_schema import EvaluationReport
+from eval_schema import JudgeScores
+from lazy_agents import lazy_agents
 
 EVAL_INSTRUCTIONS = (
     "You are a STRICT research evaluator. Return ONLY structured JSON matching the output schema.\n"
     "\n"
     "You are given:\n"
-    "1) user query\n"
+    "1) a list of ALLOWED SOURCES (numbered in the same order the answer should cite)\n"
     "2) an ANSWER in markdown (may contain inline numeric citations like [1], [2], ...)\n"
-    "3) a list of ALLOWED SOURCES (numbered in the same order the answer should cite)\n"
+    "3) the user query\n"
+    "The answer may be a single section of a longer report; if so, judge completeness against that section's heading only.\n"
     "\n"
     "Evaluation rules (NO EXCEPTIONS):\n"
     "- Judge FAITHFULNESS ONLY against the allowed sources. If a claim is not supported by those sources, treat it as unsupported.\n"
@@ -40,9 +41,16 @@ EVAL_INSTRUCTIONS = (
 )
 
 
-evaluator_agent = Agent(
-    name="EvaluatorAgent",
-    instructions=EVAL_INSTRUCTIONS,
-    model="gpt-4o-mini",
-    output_type=EvaluationReport,
-)
+def _evaluator_agent():
+    from agents import Agent
+    from model_router import model_for
+
+    return Agent(
+        name="EvaluatorAgent",
+        instructions=EVAL_INSTRUCTIONS,
+        model=model_for("evaluator"),
+        output_type=JudgeScores,
+    )
+
+
+__getattr__ = lazy_agents(__name__, evaluator_agent=_evaluator_agent)
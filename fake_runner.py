@@ -0,0 +1,237 @@
+"""
+Offline stand-in for agents.Runner: returns canned planner/search/writer/evaluator
+outputs after a simulated delay, so the orchestration can be exercised without API calls.
+Latencies and injected failures are drawn from a seeded RNG, so runs are reproducible.
+Prompt caching is simulated the way the provider does it: the longest prefix of
+instructions + input already cached, from 1024 tokens in 128-token steps, is reported
+as cached input tokens. A prefix is cached once the first call that sent it has
+completed, so calls started together (parallel section judges) don't share it.
+"""
+import asyncio
+import json
+import math
+import random
+import re
+import zlib
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+import scheduler as scheduler_module
+from planner_agent import WebSearchItem, WebSearchPlan
+from writer_agent import ReportData
+from eval_schema import EvalCriterionScore, JudgeScores
+
+# Pages the canned search summaries cite
+SOURCE_DOMAINS = ["reuters.com", "gartner.com", "mckinsey.com", "techcrunch.com", "arxiv.org",
+                  "hbr.org", "theverge.com", "nist.gov", "ft.com", "wired.com"]
+_LINK = re.compile(r"\[([^\]]+)\]\((https?://[^)]+)\)")
+
+# Simulated median seconds per call, keyed by stage
+DEFAULT_LATENCY = {"planner": 1.0, "search": 4.0, "writer": 10.0, "evaluator": 3.0, "section": 3.0}
+# Prompt-cache granularity, in characters (~4 per token)
+CACHE_MIN_CHARS = 1024 * 4
+CACHE_STEP_CHARS = 128 * 4
+
+
+@dataclass
+class Latency:
+    """Log-normal latency: `median` seconds, spread `sigma` (0 = constant)."""
+    median: float
+    sigma: float = 0.0
+
+    def sample(self, rng: random.Random) -> float:
+        return self.median * math.exp(rng.gauss(0, self.sigma)) if self.sigma else self.median
+
+
+class FakeProviderError(Exception):
+    """Injected failure that looks like a provider 429 to scheduler.is_retryable."""
+    status_code = 429
+
+CANNED_REPORT = (
+    "# Findings\n\n"
+    "Agentic systems are moving from pilots to production in customer support and IT operations [1]. "
+    "Vendors now ship orchestration frameworks with tool calling and memory built in [2].\n\n"
+    "## Adoption\n\n"
+    "Enterprises report measurable ticket deflection from autonomous support agents [3]. "
+    "Finance teams use agents for reconciliation and reporting workflows [4].\n\n"
+    "## Risks\n\n"
+    "Evaluation and guardrails remain the main blockers to broader rollout [5]. "
+    "Most deployments keep a human approval step for irreversible actions [2].\n"
+)
+
+
+def _stage(agent) -> str:
+    output_type = getattr(agent, "output_type", None)
+    if output_type is WebSearchPlan:
+        return "planner"
+    if output_type is ReportData:
+        return "writer"
+    if output_type is JudgeScores:
+        return "evaluator"
+    if getattr(agent, "name", "") == "SectionWriterAgent":
+        return "section"
+    return "search"
+
+
+def canned_output(stage: str, input) -> object:
+    if stage == "planner":
+        return WebSearchPlan(searches=[
+            WebSearchItem(reason=f"Angle {i}", query=f"{str(input).splitlines()[0][:60]} angle {i}") for i in range(1, 6)
+        ])
+    if stage == "writer":
+        return ReportData(
+            short_summary="Agentic AI is reaching production in support, IT and finance.",
+            markdown_report=CANNED_REPORT,
+            follow_up_questions=["Which guardrail patterns are most common?"],
+        )
+    if stage == "evaluator":
+        return JudgeScores(
+            criteria=[
+                EvalCriterionScore(name="Faithfulness", score=4.5, justification="Claims are cited."),
+                EvalCriterionScore(name="Relevance & Completeness", score=4.0, justification="Covers main angles."),
+                EvalCriterionScore(name="Structure & Citations", score=4.0, justification="Clear sections."),
+            ],
+            overall=4.3,
+            recommendations=["Add a date to the adoption figures.", "Cite the finance example more precisely."],
+        )
+    if stage == "section":
+        return "## Revised\n\nThe revised section keeps only cited claims [1]."
+    return _search_summary(str(input))
+
+
+def _cite(term: str, n: int) -> str:
+    h = zlib.crc32(f"{term}|{n}".encode())
+    domain = SOURCE_DOMAINS[h % len(SOURCE_DOMAINS)]
+    published = date.today() - timedelta(days=h % 120)
+    return f"([{domain}](https://www.{domain}/{published:%Y/%m/%d}/article-{h % 1000}?utm_source=openai))"
+
+
+def _search_summary(input: str) -> str:
+    term = input.splitlines()[0][:80]
+    return (
+        f"Summary for {term}: adoption is growing {_cite(term, 1)}. "
+        f"Vendors ship agent frameworks with tool calling built in {_cite(term, 2)}. "
+        f"Guardrails and evaluation lag behind deployment {_cite(term, 3)}."
+    )
+
+
+def _message_items(text: str) -> list:
+    """A final message whose markdown links carry url_citation annotations, like WebSearchTool output."""
+    annotations = [
+        SimpleNamespace(type="url_citation", title=m.group(1), url=m.group(2), start_index=m.start(), end_index=m.end())
+        for m in _LINK.finditer(text)
+    ]
+    part = SimpleNamespace(type="output_text", text=text, annotations=annotations)
+    return [SimpleNamespace(type="message_output_item", raw_item=SimpleNamespace(content=[part]))]
+
+
+class FakeResult:
+    def __init__(self, output: object, prompt: str, cached_chars: int = 0):
+        self.final_output = output
+        self.new_items = _message_items(output) if isinstance(output, str) else []
+        in_tok = len(prompt) // 4
+        out_tok = len(output.model_dump_json() if hasattr(output, "model_dump_json") else str(output)) // 4
+        self.context_wrapper = SimpleNamespace(usage=SimpleNamespace(
+            requests=1, input_tokens=in_tok, output_tokens=out_tok, total_tokens=in_tok + out_tok,
+            input_tokens_details=SimpleNamespace(cached_tokens=cached_chars // 4),
+        ))
+
+    def final_output_as(self, cls, raise_if_incorrect_type: bool = False):
+        return self.final_output
+
+
+class FakeStreamResult(FakeResult):
+    def __init__(self, output: object, prompt: str, cached_chars: int, delay: float, chunks: int, on_done=None):
+        super().__init__(output, prompt, cached_chars)
+        self._delay = delay
+        self._chunks = chunks
+        self._on_done = on_done
+
+    async def stream_events(self):
+        text = self.final_output.model_dump_json() if hasattr(self.final_output, "model_dump_json") \
+            else json.dumps(self.final_output)
+        step = max(1, len(text) // self._chunks)
+        for i in range(0, len(text), step):
+            await asyncio.sleep(self._delay / self._chunks)
+            yield SimpleNamespace(
+                type="raw_response_event",
+                data=SimpleNamespace(type="response.output_text.delta", delta=text[i:i + step]),
+            )
+        if self._on_done:
+            self._on_done()
+
+
+class FakeRunner:
+    """Implements the Runner.run / Runner.run_streamed surface used by the scheduler."""
+
+    def __init__(
+        self,
+        latency: dict[str, float | Latency] | None = None,
+        scale: float = 1.0,
+        sigma: float = 0.0,
+        failure_rate: float | dict[str, float] = 0.0,
+        seed: int = 0,
+        stream_chunks: int = 50,
+    ):
+        merged = {**DEFAULT_LATENCY, **(latency or {})}
+        self.latency = {k: v if isinstance(v, Latency) else Latency(v, sigma) for k, v in merged.items()}
+        self.scale = scale
+        self.failure_rate = failure_rate if isinstance(failure_rate, dict) else dict.fromkeys(merged, failure_rate)
+        self.rng = random.Random(seed)
+        self.stream_chunks = stream_chunks
+        self.calls: dict[str, int] = {}
+        self.failures: dict[str, int] = {}
+        self._prefixes: set[int] = set()  # hashes of prompt prefixes cached by completed calls
+
+    def delay(self, stage: str) -> float:
+        return self.latency[stage].sample(self.rng) * self.scale
+
+    def _maybe_fail(self, stage: str) -> None:
+        self.calls[stage] = self.calls.get(stage, 0) + 1
+        if self.rng.random() < self.failure_rate.get(stage, 0.0):
+            self.failures[stage] = self.failures.get(stage, 0) + 1
+            raise FakeProviderError(f"injected {stage} failure")
+
+    def _prompt(self, agent, input) -> tuple[str, int, list[int]]:
+        """
+        The full prompt (instructions + input), how many of its characters are cached
+        when the call starts, and its prefix hashes to cache once the call completes.
+        """
+        prompt = f"{getattr(agent, 'instructions', '') or ''}\n{input}"
+        prefixes = [hash(prompt[:end]) for end in range(CACHE_MIN_CHARS, len(prompt) + 1, CACHE_STEP_CHARS)]
+        cached = 0
+        for i, h in enumerate(prefixes):
+            if h not in self._prefixes:
+                break
+            cached = CACHE_MIN_CHARS + i * CACHE_STEP_CHARS
+        return prompt, cached, prefixes
+
+    async def run(self, agent, input, **kwargs) -> FakeResult:
+        stage = _stage(agent)
+        delay = self.delay(stage)
+        self._maybe_fail(stage)
+        prompt, cached, prefixes = self._prompt(agent, input)
+        await asyncio.sleep(delay)
+        self._prefixes.update(prefixes)
+        return FakeResult(canned_output(stage, input), prompt, cached)
+
+    def run_streamed(self, agent, input, **kwargs) -> FakeStreamResult:
+        stage = _stage(agent)
+        delay = self.delay(stage)
+        self._maybe_fail(stage)
+        prompt, cached, prefixes = self._prompt(agent, input)
+        return FakeStreamResult(canned_output(stage, input), prompt, cached, delay, self.stream_chunks,
+                                on_done=lambda: self._prefixes.update(prefixes))
+
+
+@contextmanager
+def install(runner: FakeRunner):
+    """Route every scheduler call to `runner` for the duration of the block."""
+    original = scheduler_module.Runner
+    scheduler_module.Runner = runner
+    try:
+        yield runner
+    finally:
+        scheduler_module.Runner = original
@@ -0,0 +1,38 @@
+"""
+Agents built on first use instead of at import.
+
+Each agent module keeps its schemas and instructions at module level and builds its
+Agent in a function, so importing the module (for ReportData, WebSearchPlan, ...)
+doesn't load the agents SDK or read model configuration. lazy_agents() makes the
+module's __getattr__ call that function the first time the agent is looked up and
+keep the result on the module, so later lookups are plain attribute reads.
+
+    __getattr__ = lazy_agents(__name__, planner_agent=_planner_agent)
+
+build_all() builds every agent of the modules imported so far (app.warm_up).
+"""
+import sys
+from typing import Callable
+
+_lazy: dict[str, tuple[str, ...]] = {}  # module name -> agent names
+
+
+def lazy_agents(module_name: str, **builders: Callable[[], object]):
+    """Module-level __getattr__ that builds each named agent once, on first access."""
+    module = sys.modules[module_name]
+    _lazy[module_name] = tuple(builders)
+
+    def __getattr__(name: str):
+        if name in builders:
+            agent = builders[name]()
+            setattr(module, name, agent)
+            return agent
+        raise AttributeError(f"module {module_name!r} has no attribute {name!r}")
+
+    return __getattr__
+
+
+def build_all() -> None:
+    for module_name, names in _lazy.items():
+        for name in names:
+            getattr(sys.modules[module_name], name)
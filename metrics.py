@@ -0,0 +1,282 @@
+"""
+Always-on, dependency-free metrics for the research pipeline (independent of
+OpenAI tracing): stage wall times, per-call latency, token usage and estimated
+cost per stage, and which quality thresholds fail.
+
+Process-wide series are exported in Prometheus text format, via render() or the
+HTTP endpoint started by start_http_server() (app.py starts it when METRICS_PORT is set).
+Each ResearchManager also keeps a RunMetrics whose summary() is a per-run JSON record,
+written to METRICS_RUN_DIR when that is set.
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+METRICS_PORT = os.getenv("METRICS_PORT")
+METRICS_RUN_DIR = os.getenv("METRICS_RUN_DIR")
+
+# USD per 1M (input, cached input, output) tokens; unknown models are costed at 0
+MODEL_PRICES = {
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+    "gpt-4o": (2.50, 1.25, 10.00),
+    "gpt-4.1": (2.00, 0.50, 8.00),
+    "gpt-4.1-mini": (0.40, 0.10, 1.60),
+    "gpt-4.1-nano": (0.10, 0.025, 0.40),
+}
+
+STAGE_BUCKETS = (0.5, 1, 2, 5, 10, 20, 30, 60, 120, 300, float("inf"))
+TOKEN_BUCKETS = (100, 500, 1000, 2000, 5000, 10000, 20000, 50000, float("inf"))
+
+
+def estimate_cost(model: str, input_tokens: int, output_tokens: int, cached_tokens: int = 0) -> float:
+    """`cached_tokens` is the part of `input_tokens` served from the provider's prompt cache."""
+    price_in, price_cached, price_out = MODEL_PRICES.get(model, (0.0, 0.0, 0.0))
+    cached = min(cached_tokens, input_tokens)
+    return ((input_tokens - cached) * price_in + cached * price_cached + output_tokens * price_out) / 1_000_000
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: tuple[str, ...], values: tuple) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + "}"
+
+
+def _fmt(v: float) -> str:
+    return "+Inf" if v == float("inf") else repr(float(v))
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        self.name, self.help, self.labels = name, help, labels
+        self._values: dict[tuple, float] = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] += amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, v in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.labels, labels)} {_fmt(v)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = (), buckets: tuple = STAGE_BUCKETS):
+        self.name, self.help, self.labels, self.buckets = name, help, labels, buckets
+        self._series: dict[tuple, list] = {}  # labels -> [bucket counts, sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels) -> None:
+        with self._lock:
+            series = self._series.setdefault(labels, [[0] * len(self.buckets), 0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, (counts, total, n) in sorted(self._series.items()):
+                for bound, c in zip(self.buckets, counts):
+                    le = _labels(self.labels + ("le",), labels + (_fmt(bound),))
+                    lines.append(f"{self.name}_bucket{le} {c}")
+                lines.append(f"{self.name}_sum{_labels(self.labels, labels)} {_fmt(total)}")
+                lines.append(f"{self.name}_count{_labels(self.labels, labels)} {n}")
+        return lines
+
+
+STAGE_SECONDS = Histogram("research_stage_seconds", "Wall time per pipeline stage", ("stage",))
+CALL_SECONDS = Histogram("research_llm_call_seconds", "Wall time per model call, including scheduler wait",
+                         ("stage", "model"))
+CALL_TOKENS = Histogram("research_llm_call_tokens", "Tokens per model call", ("stage", "direction"),
+                        buckets=TOKEN_BUCKETS)
+TOKENS = Counter("research_llm_tokens_total", "Tokens used", ("stage", "model", "direction"))
+COST = Counter("research_llm_cost_usd_total", "Estimated spend in USD", ("stage", "model"))
+CALL_ERRORS = Counter("research_llm_call_errors_total", "Model calls that raised", ("stage",))
+RUNS = Counter("research_runs_total", "Research runs by outcome", ("status",))
+EVALUATIONS = Counter("research_evaluations_total", "Reports evaluated")
+THRESHOLD_FAILURES = Counter("research_threshold_failures_total",
+                             "Evaluations failing each quality threshold", ("threshold",))
+SECTIONS = Counter("research_sections_total", "Report sections evaluated, by outcome", ("outcome",))
+ROUNDS = Counter("research_rounds_total", "Search/write/evaluate rounds run (adaptive mode can run several)")
+ROUND_SEARCHES = Histogram("research_round_searches", "Searches per round", ("round",),
+                           buckets=(1, 2, 3, 5, 8, 13, 21, float("inf")))
+EVAL_DECISIONS = Counter("research_eval_decisions_total",
+                         "Per-section evaluation policy decisions (fast_fail, judge_pass, rescored, ...)", ("decision",))
+HEDGES = Counter("research_hedged_calls_total",
+                 "Backup requests sent for slow latency-critical calls, and those that answered first",
+                 ("stage", "outcome"))
+SUBSCRIPTIONS = Counter("research_run_subscriptions_total",
+                        "Requests served by a new run or attached to an identical in-flight one", ("kind",))
+
+REGISTRY = [STAGE_SECONDS, CALL_SECONDS, CALL_TOKENS, TOKENS, COST, CALL_ERRORS,
+            RUNS, EVALUATIONS, THRESHOLD_FAILURES, SECTIONS, EVAL_DECISIONS, ROUNDS, ROUND_SEARCHES,
+            HEDGES, SUBSCRIPTIONS]
+
+
+def render() -> str:
+    """All process-wide metrics in Prometheus text exposition format."""
+    return "\n".join(line for metric in REGISTRY for line in metric.render()) + "\n"
+
+
+def _usage(result) -> tuple[int, int, int]:
+    """(input, cached input, output) tokens of a run result"""
+    usage = getattr(getattr(result, "context_wrapper", None), "usage", None)
+    cached = getattr(getattr(usage, "input_tokens_details", None), "cached_tokens", 0)
+    return (int(getattr(usage, "input_tokens", 0) or 0), int(cached or 0),
+            int(getattr(usage, "output_tokens", 0) or 0))
+
+
+class RunMetrics:
+    """Per-run collector; every observation is also added to the process-wide series."""
+
+    def __init__(self):
+        self.run_id = uuid.uuid4().hex[:12]
+        self.started_at = time.time()
+        self.stages: dict[str, float] = {}
+        self.calls: list[dict] = []
+        self.thresholds_failed: list[str] = []
+        self.eval_decisions: dict[str, int] = {}
+        self.rounds: list[dict] = []
+        self.status = "running"
+
+    def stage(self, name: str, seconds: float) -> None:
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+        STAGE_SECONDS.observe(seconds, name)
+
+    def call(self, stage: str, agent, result, seconds: float) -> None:
+        model = str(getattr(agent, "model", None) or "default")
+        input_tokens, cached_tokens, output_tokens = _usage(result)
+        cost = estimate_cost(model, input_tokens, output_tokens, cached_tokens)
+        self.calls.append({
+            "stage": stage, "model": model, "seconds": seconds, "input_tokens": input_tokens,
+            "cached_tokens": cached_tokens, "output_tokens": output_tokens, "cost_usd": cost,
+        })
+        CALL_SECONDS.observe(seconds, stage, model)
+        CALL_TOKENS.observe(input_tokens, stage, "input")
+        CALL_TOKENS.observe(output_tokens, stage, "output")
+        TOKENS.inc(stage, model, "input", amount=input_tokens)
+        TOKENS.inc(stage, model, "output", amount=output_tokens)
+        TOKENS.inc(stage, model, "cached_input", amount=cached_tokens)
+        COST.inc(stage, model, amount=cost)
+
+    def hedge_loser(self, stage: str, agent, winner_result, result, seconds: float, winner_seconds: float) -> None:
+        """
+        Tokens and cost of a hedged request that lost the race. A cancelled one has no
+        usage, so it is estimated from the winner's: the same input, uncached, and the
+        winner's output prorated by how long the loser ran.
+        """
+        model = str(getattr(agent, "model", None) or "default")
+        if result is not None:
+            input_tokens, cached_tokens, output_tokens = _usage(result)
+        else:
+            input_tokens, _, output_tokens = _usage(winner_result)
+            cached_tokens = 0
+            output_tokens = round(output_tokens * min(1.0, seconds / winner_seconds if winner_seconds else 1.0))
+        cost = estimate_cost(model, input_tokens, output_tokens, cached_tokens)
+        self.calls.append({
+            "stage": stage, "model": model, "seconds": seconds, "input_tokens": input_tokens,
+            "cached_tokens": cached_tokens, "output_tokens": output_tokens, "cost_usd": cost, "hedge_loser": True,
+        })
+        TOKENS.inc(stage, model, "input", amount=input_tokens)
+        TOKENS.inc(stage, model, "output", amount=output_tokens)
+        TOKENS.inc(stage, model, "cached_input", amount=cached_tokens)
+        COST.inc(stage, model, amount=cost)
+
+    def call_failed(self, stage: str) -> None:
+        CALL_ERRORS.inc(stage)
+
+    def evaluation(self, thresholds_failed: list[str], sections_passed: int, sections_failed: int) -> None:
+        self.thresholds_failed = thresholds_failed
+        EVALUATIONS.inc()
+        for name in thresholds_failed:
+            THRESHOLD_FAILURES.inc(name)
+        SECTIONS.inc("passed", amount=sections_passed)
+        SECTIONS.inc("failed", amount=sections_failed)
+
+    def eval_decision(self, decision: str) -> None:
+        self.eval_decisions[decision] = self.eval_decisions.get(decision, 0) + 1
+        EVAL_DECISIONS.inc(decision)
+
+    def round(self, stats: dict) -> None:
+        self.rounds.append(stats)
+        ROUNDS.inc()
+        ROUND_SEARCHES.observe(stats["searches"], str(stats["round"]))
+
+    def finish(self, status: str) -> None:
+        self.status = status
+        RUNS.inc(status)
+        if METRICS_RUN_DIR:
+            try:
+                os.makedirs(METRICS_RUN_DIR, exist_ok=True)
+                path = os.path.join(METRICS_RUN_DIR, f"{int(self.started_at)}-{self.run_id}.json")
+                with open(path, "w") as f:
+                    json.dump(self.summary(), f, indent=2)
+            except Exception as e:
+                print(f"Could not write run metrics: {e}")
+
+    def summary(self) -> dict:
+        per_stage: dict[str, dict] = {}
+        for c in self.calls:
+            s = per_stage.setdefault(c["stage"], {"calls": 0, "seconds": 0.0, "input_tokens": 0,
+                                                  "cached_tokens": 0, "output_tokens": 0, "cost_usd": 0.0})
+            s["calls"] += 1
+            for key in ("seconds", "input_tokens", "cached_tokens", "output_tokens", "cost_usd"):
+                s[key] += c[key]
+        for s in per_stage.values():
+            s["cached_ratio"] = s["cached_tokens"] / s["input_tokens"] if s["input_tokens"] else 0.0
+        input_tokens = sum(c["input_tokens"] for c in self.calls)
+        cached_tokens = sum(c["cached_tokens"] for c in self.calls)
+        return {
+            "run_id": self.run_id,
+            "started_at": self.started_at,
+            "status": self.status,
+            "stage_seconds": self.stages,
+            "calls": per_stage,
+            "input_tokens": input_tokens,
+            "cached_tokens": cached_tokens,
+            "cached_ratio": cached_tokens / input_tokens if input_tokens else 0.0,
+            "output_tokens": sum(c["output_tokens"] for c in self.calls),
+            "cost_usd": sum(c["cost_usd"] for c in self.calls),
+            "hedge_cost_usd": sum(c["cost_usd"] for c in self.calls if c.get("hedge_loser")),
+            "thresholds_failed": self.thresholds_failed,
+            "eval_decisions": self.eval_decisions,
+            "rounds": self.rounds,
+        }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_http_server(port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """Serve GET /metrics from a daemon thread."""
+    server = ThreadingHTTPServer((host, port), _Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    print(f"Metrics on http://{host}:{port}/metrics")
+    return server
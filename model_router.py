@@ -0,0 +1,201 @@
+"""
+Which model each agent uses, and hedged calls for latency-critical stages.
+
+Models come from MODEL_<AGENT> (MODEL_PLANNER, MODEL_SEARCH, MODEL_WRITER,
+MODEL_SECTION_WRITER, MODEL_EVALUATOR), falling back to MODEL_DEFAULT.
+
+ModelRouter.run() is what ResearchManager calls instead of scheduler.run(). It keeps
+a rolling window of call latencies per (stage, model). For stages in HEDGE_STAGES,
+once a window holds HEDGE_MIN_SAMPLES calls, a call still running after the
+window's HEDGE_PERCENTILE latency gets a backup request (on MODEL_<AGENT>_HEDGE if
+set, else the same model); whichever answers first wins and the other is cancelled.
+Backups are capped at HEDGE_MAX_RATIO of the stage's calls so a slow provider
+doesn't double the load on itself. run() says which agent answered and which
+requests lost, so their tokens and cost can be booked against the right models.
+"""
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+import metrics
+from scheduler import LLMScheduler, scheduler as shared_scheduler
+
+MODEL_DEFAULT = os.getenv("MODEL_DEFAULT", "gpt-4o-mini")
+HEDGE_STAGES = frozenset(s.strip() for s in os.getenv("HEDGE_STAGES", "plan,search").split(",") if s.strip())
+HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "0.9"))
+HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))
+HEDGE_MIN_DELAY_S = float(os.getenv("HEDGE_MIN_DELAY_S", "0.5"))
+HEDGE_MAX_RATIO = float(os.getenv("HEDGE_MAX_RATIO", "0.1"))
+LATENCY_WINDOW = int(os.getenv("LATENCY_WINDOW", "200"))  # calls per (stage, model)
+
+
+def model_for(agent: str) -> str:
+    """Configured model for an agent ("planner", "search", "writer", ...)."""
+    return os.getenv(f"MODEL_{agent.upper()}", MODEL_DEFAULT)
+
+
+def hedge_model_for(agent: str) -> str | None:
+    return os.getenv(f"MODEL_{agent.upper()}_HEDGE") or None
+
+
+class LatencyWindow:
+    """Last `size` latencies of one (stage, model), with percentiles over them."""
+
+    def __init__(self, size: int = LATENCY_WINDOW):
+        self._values: deque[float] = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self._values.append(seconds)
+
+    def percentile(self, q: float) -> float | None:
+        with self._lock:
+            values = sorted(self._values)
+        if not values:
+            return None
+        return values[min(len(values) - 1, int(q * len(values)))]
+
+
+@dataclass
+class Routed:
+    result: object
+    agent: object  # the agent (and so the model) whose request answered
+    # Requests that lost the race: (agent, seconds it ran, its result if it finished too)
+    losers: list[tuple[object, float, object | None]] = field(default_factory=list)
+
+
+class ModelRouter:
+    def __init__(
+        self,
+        scheduler: LLMScheduler | None = None,
+        hedge_stages: frozenset[str] = HEDGE_STAGES,
+        hedge_percentile: float = HEDGE_PERCENTILE,
+        hedge_min_samples: int = HEDGE_MIN_SAMPLES,
+        hedge_min_delay: float = HEDGE_MIN_DELAY_S,
+        hedge_max_ratio: float = HEDGE_MAX_RATIO,
+    ):
+        self.scheduler = scheduler or shared_scheduler
+        self.hedge_stages = hedge_stages
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_max_ratio = hedge_max_ratio
+        self._windows: dict[tuple[str, str], LatencyWindow] = {}
+        self._lock = threading.Lock()
+        self.calls: dict[str, int] = {}  # per stage
+        self.hedges: dict[str, int] = {}  # backups sent per stage
+        self.hedge_wins: dict[str, int] = {}  # backups that answered first
+
+    def window(self, stage: str, model: str) -> LatencyWindow:
+        with self._lock:
+            return self._windows.setdefault((stage, model), LatencyWindow())
+
+    def hedge_delay(self, stage: str, model: str) -> float | None:
+        """Seconds to wait before a backup request, or None if this call is not hedged."""
+        if stage not in self.hedge_stages:
+            return None
+        window = self.window(stage, model)
+        if len(window) < self.hedge_min_samples:
+            return None
+        with self._lock:
+            if self.hedges.get(stage, 0) >= self.hedge_max_ratio * self.calls.get(stage, 0):
+                return None
+        return max(self.hedge_min_delay, window.percentile(self.hedge_percentile))
+
+    async def _timed(self, stage: str, agent, input):
+        model = str(getattr(agent, "model", None) or "default")
+        start = time.perf_counter()
+        try:
+            result = await self.scheduler.run(agent, input)
+        except asyncio.CancelledError:
+            # A cancelled loser ran at least this long; keeping it stops the window drifting fast
+            self.window(stage, model).observe(time.perf_counter() - start)
+            raise
+        self.window(stage, model).observe(time.perf_counter() - start)
+        return result
+
+    async def run(self, stage: str, agent, input) -> Routed:
+        """scheduler.run(agent, input), hedged for latency-critical stages"""
+        model = str(getattr(agent, "model", None) or "default")
+        with self._lock:
+            self.calls[stage] = self.calls.get(stage, 0) + 1
+        delay = self.hedge_delay(stage, model)
+        if delay is None:
+            return Routed(await self._timed(stage, agent, input), agent)
+
+        started = time.perf_counter()
+        primary = asyncio.create_task(self._timed(stage, agent, input))
+        tasks = [primary]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done:
+                return Routed(primary.result(), agent)
+
+            backup_model = hedge_model_for(_agent_key(agent))
+            backup_agent = agent.clone(model=backup_model) if backup_model else agent
+            backup_started = time.perf_counter()
+            backup = asyncio.create_task(self._timed(stage, backup_agent, input))
+            tasks.append(backup)
+            agents = {primary: (agent, started), backup: (backup_agent, backup_started)}
+            with self._lock:
+                self.hedges[stage] = self.hedges.get(stage, 0) + 1
+            metrics.HEDGES.inc(stage, "sent")
+            pending, error = set(tasks), None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        # The other request may still succeed
+                        error = error or task.exception()
+                        continue
+                    if task is backup:
+                        with self._lock:
+                            self.hedge_wins[stage] = self.hedge_wins.get(stage, 0) + 1
+                        metrics.HEDGES.inc(stage, "won")
+                    (other,) = [t for t in tasks if t is not task]
+                    loser, loser_started = agents[other]
+                    losers = []
+                    if not other.done():  # cancelled below, after spending some tokens
+                        losers.append((loser, time.perf_counter() - loser_started, None))
+                    elif other.exception() is None:  # answered in the same instant
+                        losers.append((loser, time.perf_counter() - loser_started, other.result()))
+                    return Routed(task.result(), agents[task][0], losers)
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def stats(self) -> dict:
+        with self._lock:
+            windows = dict(self._windows)
+            stats = {"calls": dict(self.calls), "hedges": dict(self.hedges), "hedge_wins": dict(self.hedge_wins)}
+        stats["latency_s"] = {
+            f"{stage}/{model}": {"n": len(w), "p50": w.percentile(0.5), "p90": w.percentile(0.9),
+                                 "p99": w.percentile(0.99)}
+            for (stage, model), w in windows.items()
+        }
+        return stats
+
+
+def _agent_key(agent) -> str:
+    """MODEL_<key> suffix for an agent, from its name ("PlannerAgent" -> "planner")."""
+    name = getattr(agent, "name", "")
+    return {
+        "PlannerAgent": "planner",
+        "Search agent": "search",
+        "WriterAgent": "writer",
+        "SectionWriterAgent": "section_writer",
+        "EvaluatorAgent": "evaluator",
+    }.get(name, name.lower().replace(" ", "_"))
+
+
+# Shared by every ResearchManager so latency windows and hedge budgets span runs
+router = ModelRouter()
@@ -0,0 +1,113 @@
+"""
+One keep-alive-pooled AsyncOpenAI client shared by every agent call.
+
+LLMScheduler passes run_config() to each Runner.run, so every agent's model is
+resolved through a provider backed by this client rather than one the SDK builds
+for itself. The pool size and keep-alive settings come from OPENAI_MAX_CONNECTIONS,
+OPENAI_MAX_KEEPALIVE and OPENAI_KEEPALIVE_EXPIRY_S. The client's own retries are
+off by default (OPENAI_MAX_RETRIES=0), because the scheduler already retries
+retryable errors within its rate budget.
+
+httpx connections belong to the event loop that opened them, so there is one client
+per running loop. The app and batch runs use a single loop, so in practice there is
+one client. Clients are created on first use, so nothing here needs an API key until
+a real call is made.
+"""
+import asyncio
+import os
+import time
+import weakref
+
+import httpx
+from agents import Model, ModelProvider, OpenAIProvider, RunConfig
+from openai import AsyncOpenAI
+
+OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "100"))
+OPENAI_MAX_KEEPALIVE = int(os.getenv("OPENAI_MAX_KEEPALIVE", "20"))
+OPENAI_KEEPALIVE_EXPIRY_S = float(os.getenv("OPENAI_KEEPALIVE_EXPIRY_S", "60"))
+OPENAI_TIMEOUT_S = float(os.getenv("OPENAI_TIMEOUT_S", "600"))
+OPENAI_CONNECT_TIMEOUT_S = float(os.getenv("OPENAI_CONNECT_TIMEOUT_S", "5"))
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "0"))
+# Open a connection to the API during warm-up, so the first request skips DNS and TLS
+OPENAI_WARMUP = os.getenv("OPENAI_WARMUP", "1") != "0"
+
+
+class _PooledProvider(ModelProvider):
+    """Resolves model names against the pool's client for the running loop."""
+
+    def __init__(self, pool: "OpenAIClientPool"):
+        self._pool = pool
+
+    def get_model(self, model_name: str | None) -> Model:
+        return OpenAIProvider(openai_client=self._pool.client()).get_model(model_name)
+
+
+class OpenAIClientPool:
+    def __init__(
+        self,
+        max_connections: int = OPENAI_MAX_CONNECTIONS,
+        max_keepalive: int = OPENAI_MAX_KEEPALIVE,
+        keepalive_expiry: float = OPENAI_KEEPALIVE_EXPIRY_S,
+        timeout: float = OPENAI_TIMEOUT_S,
+        connect_timeout: float = OPENAI_CONNECT_TIMEOUT_S,
+        max_retries: int = OPENAI_MAX_RETRIES,
+    ):
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive,
+                                   keepalive_expiry=keepalive_expiry)
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.max_retries = max_retries
+        self._clients: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncOpenAI] = weakref.WeakKeyDictionary()
+        self._warmed: weakref.WeakSet[asyncio.AbstractEventLoop] = weakref.WeakSet()
+        self.created = 0
+        self._run_config = RunConfig(model_provider=_PooledProvider(self))
+
+    def client(self) -> AsyncOpenAI:
+        """The shared client for the running event loop."""
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            http = httpx.AsyncClient(limits=self.limits, timeout=self.timeout, follow_redirects=True)
+            client = AsyncOpenAI(http_client=http, max_retries=self.max_retries, timeout=self.timeout)
+            self._clients[loop] = client
+            self.created += 1
+        return client
+
+    def run_config(self) -> RunConfig:
+        """RunConfig that resolves every agent's model through the shared client."""
+        return self._run_config
+
+    async def warm_up(self) -> float | None:
+        """
+        Open a pooled connection on the running loop (one cheap GET /models); seconds
+        taken, or None if skipped. Safe to call on every page load: it runs once per loop.
+        """
+        loop = asyncio.get_running_loop()
+        if not OPENAI_WARMUP or not os.getenv("OPENAI_API_KEY") or loop in self._warmed:
+            return None
+        self._warmed.add(loop)
+        start = time.perf_counter()
+        try:
+            await self.client().models.list()
+        except Exception as e:
+            print(f"OpenAI warm-up failed ({e.__class__.__name__}); the first request will connect")
+            return None
+        return time.perf_counter() - start
+
+    async def aclose(self) -> None:
+        """Close the running loop's client and its connections."""
+        client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.close()
+
+    def stats(self) -> dict:
+        return {
+            "clients": len(self._clients),
+            "created": self.created,
+            "max_connections": self.limits.max_connections,
+            "max_keepalive": self.limits.max_keepalive_connections,
+            "keepalive_expiry_s": self.limits.keepalive_expiry,
+        }
+
+
+# Shared by the scheduler (and so every agent) in the process
+openai_clients = OpenAIClientPool()
@@ -1,11 +1,13 @@
 from pydantic import BaseModel, Field
-from agents import Agent
+
+from lazy_agents import lazy_agents
 
 HOW_MANY_SEARCHES = 5
 
 INSTRUCTIONS = (
     "You are a helpful research assistant. Given a query, propose specific web searches "
-    f"to perform to best answer the query. Output exactly {HOW_MANY_SEARCHES} focused queries. "
+    f"to perform to best answer the query. Output exactly {HOW_MANY_SEARCHES} focused queries, "
+    "or exactly the number of searches the input asks for. "
     "Avoid general terms; include likely authoritative sources or entities in the query."
 )
 
@@ -19,9 +21,16 @@ class WebSearchItem(BaseModel):
 class WebSearchPlan(BaseModel):
     searches: list[WebSearchItem] = Field(description="A list of web searches to perform to best answer the query.")
     
-planner_agent = Agent(
-    name="PlannerAgent",
-    instructions=INSTRUCTIONS,
-    model="gpt-4o-mini",
-    output_type=WebSearchPlan,
-)
\ No newline at end of file
+def _planner_agent():
+    from agents import Agent
+    from model_router import model_for
+
+    return Agent(
+        name="PlannerAgent",
+        instructions=INSTRUCTIONS,
+        model=model_for("planner"),
+        output_type=WebSearchPlan,
+    )
+
+
+__getattr__ = lazy_agents(__name__, planner_agent=_planner_agent)
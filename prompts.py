@@ -0,0 +1,73 @@
+"""
+Inputs for the writer, section writer and judge, laid out for provider prompt caching.
+
+OpenAI reuses the longest prompt prefix it has seen recently (from 1024 tokens, in
+128-token steps) and bills those input tokens at a discount. A run's calls share
+most of their input: the writer, every section judge and every revision all see the
+same numbered sources. So each prompt puts content that is stable across calls
+first and what varies per call last:
+
+    agent instructions -> sources -> notes / draft -> section, feedback -> query
+
+render_sources() produces the one sources block a round uses everywhere, so the
+text after each agent's instructions is byte-identical between its calls. Later
+rounds append new sources at the end, which keeps the earlier part of the block cached.
+"""
+
+
+def render_sources(sources: list[dict]) -> str:
+    """
+    Numbered sources list. sources: dicts with keys
+      - url: str
+      - title: str | None
+      - published_at: ISO8601 str | None
+      - snippet: str | None
+    """
+    lines = []
+    for i, s in enumerate(sources, start=1):
+        line = f"[{i}] {s.get('title') or s.get('url') or f'Source {i}'}"
+        if s.get("published_at"):
+            line += f" ({s['published_at']})"
+        if s.get("snippet"):
+            line += f": {s['snippet'][:250]}"
+        if s.get("url"):
+            line += f" — {s['url']}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def writer_prompt(sources_block: str, notes: str, query: str) -> str:
+    return (
+        f"## Sources (for inline [n] citations)\n{sources_block}\n\n"
+        f"## Research notes (deduplicated; each line ends with the sources that support it)\n{notes}\n\n"
+        f"## Original query\n{query}"
+    )
+
+
+def eval_prompt(sources_block: str, markdown: str, query: str, section: str | None = None) -> str:
+    """
+    section: heading of the section being judged, when `markdown` is one section
+      of a longer report ('' for the text before the first heading).
+    """
+    scope = ""
+    if section is not None:
+        scope = (
+            f"## Scope\nThe answer is only the section \"{section or 'Introduction'}\" of a longer report. "
+            "Judge Relevance & Completeness against what this section sets out to cover.\n\n"
+        )
+    return (
+        f"## Allowed Sources\n{sources_block}\n\n"
+        f"## Answer (Markdown)\n{markdown}\n\n"
+        f"{scope}"
+        f"## User Query\n{query}"
+    )
+
+
+def revise_prompt(sources_block: str, section: str, notes: str, feedback: str, query: str) -> str:
+    return (
+        f"## Sources (for inline [n] citations)\n{sources_block}\n\n"
+        f"## Section\n{section}\n\n"
+        f"## Research notes\n{notes}\n\n"
+        f"## Feedback\n{feedback}\n\n"
+        f"## Original query\n{query}"
+    )
@@ -0,0 +1,220 @@
+"""
+Deterministic quality metrics for a report and its sources, without a model call.
+
+analyze_report() scans each section once with a single compiled pattern that
+finds both [n] citations and sentence boundaries. It collects, per section and
+overall:
+  coverage           fraction of sentences carrying at least one valid [n]
+  invalid citations  [n] outside 1..len(sources), plus malformed ones ([1-3], [1, 2])
+  citation density   [n] markers per 100 words
+It also computes source-level metrics: sources never cited, domain diversity
+(1 - Herfindahl index over hostnames), and the spread of source ages.
+
+The manager's deterministic gates use it, so a section citing [7] when there are 5
+sources is revised without a judge call.
+
+    python report_analysis.py results.jsonl [--out analysis.jsonl] [--workers 4]
+
+analyzes every "ok" row of a batch_research.py output file and prints aggregates.
+"""
+import argparse
+import json
+import math
+import re
+import statistics
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+from report_sections import split_sections
+
+# One alternation, one pass: [n] (group 1), a malformed [n, m] / [n-m] (group 2), or a
+# sentence boundary (neither group); findall keeps the per-match work in C
+_SCAN = re.compile(r"\[(?:(\d+)\]|(\d+(?:\s*[-–,]\s*\d+)+\]))|(?<=[.!?])\s+")
+
+
+@dataclass
+class SectionMetrics:
+    heading: str
+    words: int
+    sentences: int
+    cited_sentences: int
+    coverage: float
+    citations: int  # well-formed [n] markers, valid or not
+    invalid_citations: list[int] = field(default_factory=list)  # out-of-range n, sorted, unique
+    malformed_citations: int = 0
+
+
+@dataclass
+class ReportMetrics:
+    sections: list[SectionMetrics]
+    sentences: int
+    cited_sentences: int
+    coverage: float
+    citations: int
+    invalid_citations: list[int]
+    malformed_citations: int
+    citation_density: float  # markers per 100 words
+    sources: int
+    cited_sources: int
+    unused_sources: list[int]  # 1-based numbers of sources never cited
+    domains: int
+    domain_diversity: float
+    dated_sources: int
+    median_age_days: float  # math.inf when no source is dated
+    age_p90_days: float
+    oldest_days: float
+    newest_days: float
+
+    def as_dict(self) -> dict:
+        data = asdict(self)
+        for key in ("median_age_days", "age_p90_days", "oldest_days", "newest_days"):
+            if math.isinf(data[key]):
+                data[key] = None  # JSON has no infinity
+        return data
+
+
+def _scan(text: str, num_sources: int, cited: set[int]) -> SectionMetrics:
+    """Sentence and citation counts for one block of markdown; adds valid source numbers to `cited`."""
+    sentences = cited_sentences = citations = malformed = 0
+    invalid: set[int] = set()
+    sentence_cited = False
+    for number, bad in _SCAN.findall(text):
+        if number:
+            n = int(number)
+            citations += 1
+            if 1 <= n <= num_sources:
+                cited.add(n)
+                sentence_cited = True
+            else:
+                invalid.add(n)
+        elif bad:
+            malformed += 1
+        else:
+            sentences += 1
+            cited_sentences += sentence_cited
+            sentence_cited = False
+    # The last sentence has no boundary after it unless the text ends in punctuation + whitespace
+    stripped = text.rstrip()
+    if stripped and not (stripped[-1] in ".!?" and len(stripped) < len(text)):
+        sentences += 1
+        cited_sentences += sentence_cited
+    return SectionMetrics(
+        heading="", words=len(text.split()), sentences=sentences, cited_sentences=cited_sentences,
+        coverage=cited_sentences / sentences if sentences else 0.0, citations=citations,
+        invalid_citations=sorted(invalid), malformed_citations=malformed,
+    )
+
+
+def analyze_section(text: str, num_sources: int) -> SectionMetrics:
+    return _scan(text or "", num_sources, set())
+
+
+def citation_coverage(markdown: str, num_sources: int | None = None) -> float:
+    """Fraction of sentences with a valid [n]; any number counts when num_sources is None."""
+    return _scan(markdown or "", math.inf if num_sources is None else num_sources, set()).coverage
+
+
+def _domain(url: str) -> str | None:
+    try:
+        host = urlsplit(url).hostname
+    except ValueError:
+        return None
+    return host.removeprefix("www.") if host else None
+
+
+def _age_days(value: str | None, now: datetime) -> int | None:
+    if not value:
+        return None
+    try:
+        dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return (now - dt).days
+
+
+def analyze_report(markdown: str, sources: list[dict], now: datetime | None = None) -> ReportMetrics:
+    """All deterministic metrics of a report whose [n] refer to sources[n-1]."""
+    now = now or datetime.now(timezone.utc)
+    cited: set[int] = set()
+    sections = []
+    for sec in split_sections(markdown or ""):
+        metrics = _scan(sec.text, len(sources), cited)
+        metrics.heading = sec.heading
+        sections.append(metrics)
+
+    sentences = sum(s.sentences for s in sections)
+    cited_sentences = sum(s.cited_sentences for s in sections)
+    citations = sum(s.citations for s in sections)
+    words = sum(s.words for s in sections)
+
+    domains = Counter(d for d in (_domain(s.get("url") or "") for s in sources) if d)
+    total = sum(domains.values())
+    ages = sorted(a for a in (_age_days(s.get("published_at"), now) for s in sources) if a is not None)
+
+    return ReportMetrics(
+        sections=sections,
+        sentences=sentences,
+        cited_sentences=cited_sentences,
+        coverage=cited_sentences / sentences if sentences else 0.0,
+        citations=citations,
+        invalid_citations=sorted({n for s in sections for n in s.invalid_citations}),
+        malformed_citations=sum(s.malformed_citations for s in sections),
+        citation_density=100 * citations / words if words else 0.0,
+        sources=len(sources),
+        cited_sources=len(cited),
+        unused_sources=[n for n in range(1, len(sources) + 1) if n not in cited],
+        domains=len(domains),
+        domain_diversity=1 - sum((c / total) ** 2 for c in domains.values()) if total else 0.0,
+        dated_sources=len(ages),
+        median_age_days=statistics.median(ages) if ages else math.inf,
+        age_p90_days=ages[min(len(ages) - 1, int(0.9 * len(ages)))] if ages else math.inf,
+        oldest_days=ages[-1] if ages else math.inf,
+        newest_days=ages[0] if ages else math.inf,
+    )
+
+
+def _analyze_row(row: dict) -> dict:
+    metrics = analyze_report(row.get("report") or "", row.get("sources") or [])
+    return {"id": row.get("id"), "query": row.get("query"), **metrics.as_dict()}
+
+
+def analyze_rows(rows: list[dict], workers: int = 1) -> list[dict]:
+    """analyze_report over batch_research.py result rows (needs "report" and "sources")."""
+    if workers <= 1:
+        return [_analyze_row(row) for row in rows]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_analyze_row, rows, chunksize=32))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("results", help="batch_research.py output (JSONL)")
+    parser.add_argument("--out", help="write one metrics line per report here")
+    parser.add_argument("--workers", type=int, default=1, help="processes to analyze with")
+    args = parser.parse_args()
+
+    with open(args.results, encoding="utf-8") as f:
+        rows = [row for row in map(json.loads, filter(str.strip, f)) if row.get("status") == "ok"]
+    results = analyze_rows(rows, args.workers)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            for r in results:
+                f.write(json.dumps(r, ensure_ascii=False) + "\n")
+
+    n = len(results) or 1
+    print(f"{len(results)} reports")
+    print(f"  mean coverage        {sum(r['coverage'] for r in results) / n:.2f}")
+    print(f"  invalid citations    {sum(bool(r['invalid_citations']) for r in results)} reports")
+    print(f"  malformed citations  {sum(bool(r['malformed_citations']) for r in results)} reports")
+    print(f"  unused sources       {sum(len(r['unused_sources']) for r in results) / n:.1f} per report")
+    print(f"  citation density     {sum(r['citation_density'] for r in results) / n:.1f} per 100 words")
+    print(f"  domain diversity     {sum(r['domain_diversity'] for r in results) / n:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+"""
+Semantic cache of finished research runs, so paraphrased questions don't rerun the
+whole pipeline.
+
+Queries are embedded as hashed TF-IDF vectors (word unigrams + bigrams, light
+stemming, no external model) and compared by cosine similarity with NumPy:
+  - similarity >= REPORT_CACHE_HIT_SIM:   reuse the final report and its eval scores
+  - similarity >= REPORT_CACHE_REUSE_SIM: reuse the search plan and results; rewrite the report
+Similarity alone can't tell "exports to Brazil" from "exports to China", so a past
+run is only used if both questions also share their anchors: the numbers and named
+entities either of them mentions must appear in both (see _same_anchors).
+Entries live in SQLite next to the search cache and expire after REPORT_CACHE_TTL
+seconds; least-recently-used entries are evicted beyond REPORT_CACHE_MAX_ENTRIES.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+from dataclasses import dataclass
+
+import aiosqlite
+import numpy as np
+
+import sqlite_db
+
+REPORT_CACHE_ENABLED = os.getenv("REPORT_CACHE", "1") != "0"
+REPORT_CACHE_PATH = os.getenv("REPORT_CACHE_PATH", ".cache/report_cache.sqlite3")
+REPORT_CACHE_TTL = float(os.getenv("REPORT_CACHE_TTL", str(24 * 3600)))  # seconds
+REPORT_CACHE_MAX_ENTRIES = int(os.getenv("REPORT_CACHE_MAX_ENTRIES", "1000"))
+REPORT_CACHE_HIT_SIM = float(os.getenv("REPORT_CACHE_HIT_SIM", "0.92"))
+REPORT_CACHE_REUSE_SIM = float(os.getenv("REPORT_CACHE_REUSE_SIM", "0.85"))
+
+_DIM = 1 << 12
+_WORD = re.compile(r"\w+")
+_CLAUSE = re.compile(r"[,;:()\[\]]")
+_TRAILING = re.compile(r"[\s.?!]+$")
+_SUFFIXES = ("ingly", "ings", "ing", "edly", "ed", "ions", "ion", "ies", "es", "s", "e", "y")
+_STOPWORDS = frozenset("""
+a an and are as at be by can could do does for from how i in into is it its me my of on or
+please should tell than that the their there these this to was what when where which who why
+will with would you your about give explain describe most latest recent current new
+being been has have had were
+""".split())
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS report_cache (
+    key         TEXT PRIMARY KEY,
+    query       TEXT NOT NULL,
+    value       TEXT NOT NULL,
+    created_at  REAL NOT NULL,
+    last_access REAL NOT NULL,
+    hit_count   INTEGER NOT NULL DEFAULT 0
+)
+"""
+
+
+def query_key(query: str) -> str:
+    """
+    Exact identity of a question: casefolded with whitespace collapsed and trailing
+    punctuation dropped. Word order and other punctuation are kept, so "Is Python
+    faster than Rust?" and "Is Rust faster than Python?" are different questions.
+    """
+    text = " ".join(unicodedata.normalize("NFKC", query or "").casefold().split())
+    return _TRAILING.sub("", text)
+
+
+def _stem(word: str) -> str:
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[:-len(suffix)]
+    return word
+
+
+def _hash(term: str) -> int:
+    return int.from_bytes(hashlib.blake2b(term.encode(), digest_size=8).digest(), "big") % _DIM
+
+
+def _words(query: str) -> list[str]:
+    # Single letters are dropped too: the "s" of a possessive, stray initials
+    text = unicodedata.normalize("NFKC", query or "").lower()
+    return [_stem(w) for w in _WORD.findall(text) if w not in _STOPWORDS and (len(w) > 1 or w.isdigit())]
+
+
+def _features(query: str) -> dict[int, float]:
+    """Hashed, sublinear term frequencies of the query's stemmed unigrams and bigrams."""
+    counts: dict[int, float] = {}
+    # Bigrams count half and stop at commas, so reordered paraphrases and lists still score high
+    for clause in _CLAUSE.split(query or ""):
+        words = _words(clause)
+        for term, weight in [(w, 1.0) for w in words] + [(f"{a} {b}", 0.5) for a, b in zip(words, words[1:])]:
+            h = _hash(term)
+            counts[h] = counts.get(h, 0.0) + weight
+    return {h: 1.0 + float(np.log(c)) if c >= 1 else c for h, c in counts.items()}
+
+
+def _entities(query: str) -> set[str]:
+    """Numbers and capitalized words (past the first word, or with inner capitals: OpenAI, US), casefolded."""
+    text = unicodedata.normalize("NFKC", query or "")
+    found = set()
+    for i, word in enumerate(_WORD.findall(text)):
+        if word.isdigit() or any(c.isupper() for c in word[1:]) or (i and word[0].isupper() and word != "I"):
+            found.add(word.casefold())
+    return found
+
+
+def _same_anchors(query: str, other: str) -> bool:
+    """
+    Whether two similar questions ask about the same things: every number or named
+    entity in either question appears in both, whatever its case or position. So a
+    lowercased question or a reordered list of companies still matches, but
+    "exports to Brazil" doesn't match "exports to China".
+    """
+    anchors = _entities(query) | _entities(other)
+    ours = set(_WORD.findall(unicodedata.normalize("NFKC", query or "").casefold()))
+    theirs = set(_WORD.findall(unicodedata.normalize("NFKC", other or "").casefold()))
+    return anchors <= ours & theirs
+
+
+@dataclass
+class CachedRun:
+    query: str
+    similarity: float
+    value: dict  # plan, search_results, sources, report, eval
+
+
+class ReportCache:
+    """
+    Similarity index over past queries, backed by SQLite. The index is a dense
+    (entries x _DIM) term-frequency matrix kept in memory and rebuilt from the
+    table on first use; IDF weights come from the cached queries themselves.
+    Cache errors are logged and treated as misses so they never break a run.
+    """
+
+    def __init__(
+        self,
+        path: str = REPORT_CACHE_PATH,
+        ttl: float = REPORT_CACHE_TTL,
+        max_entries: int = REPORT_CACHE_MAX_ENTRIES,
+        hit_similarity: float = REPORT_CACHE_HIT_SIM,
+        reuse_similarity: float = REPORT_CACHE_REUSE_SIM,
+        enabled: bool = REPORT_CACHE_ENABLED,
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hit_similarity = hit_similarity
+        self.reuse_similarity = reuse_similarity
+        self.enabled = enabled and ttl > 0
+        self.hits = 0
+        self.reuses = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._entries: dict[str, tuple[dict[int, float], float, str]] = {}  # key -> (features, created_at, query)
+        self._keys: list[str] = []
+        self._created: np.ndarray | None = None
+        self._matrix: np.ndarray | None = None  # rebuilt lazily when entries change
+
+    async def _load(self, db: aiosqlite.Connection) -> None:
+        if self._loaded:
+            return
+        async with db.execute("SELECT key, query, created_at FROM report_cache") as cur:
+            rows = await cur.fetchall()
+        with self._lock:
+            if not self._loaded:
+                for key, query, created_at in rows:
+                    self._entries.setdefault(key, (_features(query), created_at, query))
+                self._matrix = None
+                self._loaded = True
+
+    def _index(self) -> tuple[list[str], np.ndarray, np.ndarray]:
+        with self._lock:
+            if self._matrix is None:
+                self._keys = list(self._entries)
+                self._created = np.array([self._entries[k][1] for k in self._keys], dtype=np.float64)
+                matrix = np.zeros((len(self._keys), _DIM), dtype=np.float32)
+                for row, key in enumerate(self._keys):
+                    for col, tf in self._entries[key][0].items():
+                        matrix[row, col] = tf
+                self._matrix = matrix
+            return self._keys, self._matrix, self._created
+
+    def _nearest(self, query: str, now: float) -> tuple[str, float] | None:
+        """The most similar fresh entry at or above reuse_similarity whose anchors match."""
+        keys, matrix, created = self._index()
+        if not keys:
+            return None
+        q = np.zeros(_DIM, dtype=np.float32)
+        for col, tf in _features(query).items():
+            q[col] = tf
+        df = np.count_nonzero(matrix, axis=0)
+        idf = (np.log((1 + len(keys)) / (1 + df)) + 1).astype(np.float32)
+        docs = matrix * idf
+        q *= idf
+        norms = np.linalg.norm(docs, axis=1) * (np.linalg.norm(q) or 1.0)
+        sims = np.divide(docs @ q, norms, out=np.zeros(len(keys), dtype=np.float32), where=norms > 0)
+        sims[created <= now - self.ttl] = -1.0
+        for best in np.argsort(-sims):
+            if sims[best] < self.reuse_similarity:
+                break
+            if _same_anchors(query, self._entries[keys[best]][2]):
+                return keys[best], float(sims[best])
+        return None
+
+    async def lookup(self, query: str) -> CachedRun | None:
+        """The most similar fresh past run, if it clears REPORT_CACHE_REUSE_SIM and shares the query's anchors."""
+        if not self.enabled:
+            return None
+        now = time.time()
+        try:
+            db = await sqlite_db.connect(self.path, _SCHEMA)
+            try:
+                await self._load(db)
+                nearest = self._nearest(query, now)
+                if nearest is None:
+                    self.misses += 1
+                    return None
+                key, similarity = nearest
+                async with db.execute("SELECT query, value FROM report_cache WHERE key = ?", (key,)) as cur:
+                    row = await cur.fetchone()
+                if row is None:
+                    self.misses += 1
+                    return None
+                await db.execute(
+                    "UPDATE report_cache SET last_access = ?, hit_count = hit_count + 1 WHERE key = ?", (now, key)
+                )
+                await db.commit()
+            finally:
+                await db.close()
+        except Exception as e:
+            print(f"Report cache read failed: {e}")
+            self.misses += 1
+            return None
+        if similarity >= self.hit_similarity:
+            self.hits += 1
+        else:
+            self.reuses += 1
+        return CachedRun(query=row[0], similarity=similarity, value=json.loads(row[1]))
+
+    async def put(self, query: str, value: dict) -> None:
+        """Store a finished run (anything JSON-serializable) and apply TTL/LRU eviction."""
+        if not self.enabled:
+            return
+        key = query_key(query)
+        payload = json.dumps(value)
+        now = time.time()
+        try:
+            db = await sqlite_db.connect(self.path, _SCHEMA)
+            try:
+                await self._load(db)
+                await db.execute(
+                    "INSERT OR REPLACE INTO report_cache (key, query, value, created_at, last_access) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, query, payload, now, now),
+                )
+                cur = await db.execute("DELETE FROM report_cache WHERE created_at <= ?", (now - self.ttl,))
+                removed = max(cur.rowcount, 0)
+                cur = await db.execute(
+                    "DELETE FROM report_cache WHERE key IN ("
+                    "SELECT key FROM report_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+                removed += max(cur.rowcount, 0)
+                await db.commit()
+                async with db.execute("SELECT key FROM report_cache") as cur:
+                    remaining = {k for (k,) in await cur.fetchall()}
+            finally:
+                await db.close()
+        except Exception as e:
+            print(f"Report cache write failed: {e}")
+            return
+        self.evictions += removed
+        with self._lock:
+            self._entries[key] = (_features(query), now, query)
+            for stale in [k for k in self._entries if k not in remaining]:
+                del self._entries[stale]
+            self._matrix = None
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.reuses + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "reuses": self.reuses,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+# Shared by every ResearchManager in the process so the index and counters span runs
+report_cache = ReportCache()
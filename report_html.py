@@ -0,0 +1,104 @@
+"""
+Deterministic HTML rendering of a finished report, for email.
+
+The report markdown goes through markdown-it (CommonMark plus tables, raw HTML
+disabled). A core rule then turns each inline [n] citation into a link to source n.
+The sources are listed at the end, and all styling is inline because email clients
+drop <style> blocks. The same report and sources always render to the same HTML.
+"""
+import html
+import re
+
+from markdown_it import MarkdownIt
+from markdown_it.token import Token
+
+from writer_agent import ReportData
+
+_CITATION = re.compile(r"\[(\d+)\]")
+
+_STYLE = {
+    "body": "font-family:-apple-system,Segoe UI,Helvetica,Arial,sans-serif;font-size:15px;line-height:1.55;"
+            "color:#1f2328;max-width:720px;margin:0 auto;padding:16px",
+    "summary": "background:#f6f8fa;border-left:4px solid #0969da;padding:8px 12px;margin:0 0 16px",
+    "cite": "color:#0969da;text-decoration:none",
+    "sources": "font-size:13px;color:#57606a",
+}
+
+
+def _text(content: str) -> Token:
+    token = Token("text", "", 0)
+    token.content = content
+    return token
+
+
+def _citation_links(state) -> None:
+    """Core rule: [n] in plain text (not inside an existing link) -> <a href=source n>[n]</a>"""
+    urls = state.env.get("citation_urls") or []
+    for block in state.tokens:
+        if block.type != "inline" or not block.children:
+            continue
+        children, depth = [], 0
+        for token in block.children:
+            depth += (token.type == "link_open") - (token.type == "link_close")
+            if token.type != "text" or depth or "[" not in token.content:
+                children.append(token)
+                continue
+            pos = 0
+            for match in _CITATION.finditer(token.content):
+                n = int(match.group(1))
+                if not 1 <= n <= len(urls) or not urls[n - 1]:
+                    continue
+                if match.start() > pos:
+                    children.append(_text(token.content[pos:match.start()]))
+                link = Token("link_open", "a", 1)
+                link.attrSet("href", urls[n - 1])
+                link.attrSet("style", _STYLE["cite"])
+                children += [link, _text(match.group(0)), Token("link_close", "a", -1)]
+                pos = match.end()
+            if pos < len(token.content):
+                children.append(_text(token.content[pos:]))
+        block.children = children
+
+
+_md = MarkdownIt("commonmark", {"html": False}).enable("table")
+_md.core.ruler.push("citation_links", _citation_links)
+
+
+def _safe_url(url: str | None) -> str | None:
+    return url if url and url.startswith(("https://", "http://")) else None
+
+
+def render_markdown(markdown: str, sources: list[dict]) -> str:
+    """HTML fragment for the report body with [n] linked to sources[n-1]['url']."""
+    return _md.render(markdown or "", {"citation_urls": [_safe_url(s.get("url")) for s in sources]})
+
+
+def render_sources(sources: list[dict]) -> str:
+    items = []
+    for i, s in enumerate(sources, start=1):
+        url = _safe_url(s.get("url"))
+        title = html.escape(s.get("title") or s.get("url") or f"Source {i}")
+        label = f'<a href="{html.escape(url)}">{title}</a>' if url else title
+        date = f" ({html.escape(s['published_at'])})" if s.get("published_at") else ""
+        items.append(f'<li value="{i}">{label}{date}</li>')
+    return f'<ol style="{_STYLE["sources"]}">{"".join(items)}</ol>' if items else ""
+
+
+def render_report_email(query: str, report: ReportData, sources: list[dict]) -> tuple[str, str, str]:
+    """(subject, html, plain text) for emailing a finished report."""
+    subject = f"Research report: {query.strip()[:120]}"
+    body = (
+        f'<div style="{_STYLE["summary"]}">{render_markdown(report.short_summary, sources)}</div>'
+        f"{render_markdown(report.markdown_report, sources)}"
+    )
+    if sources:
+        body += f"<h2>Sources</h2>{render_sources(sources)}"
+    document = (
+        '<!DOCTYPE html><html><head><meta charset="utf-8">'
+        f"<title>{html.escape(subject)}</title></head>"
+        f'<body><div style="{_STYLE["body"]}">{body}</div></body></html>'
+    )
+    text = "\n".join([report.short_summary, "", report.markdown_report, "", "Sources:"] + [
+        f"[{i}] {s.get('title') or s.get('url')} {s.get('url') or ''}".rstrip() for i, s in enumerate(sources, start=1)
+    ])
+    return subject, document, text
@@ -0,0 +1,45 @@
+import re
+from dataclasses import dataclass
+
+_HEADING = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+_FENCE = re.compile(r"^\s*(```|~~~)")
+
+
+@dataclass
+class Section:
+    heading: str  # heading text without the leading #'s; "" for text before the first heading
+    text: str  # the section's markdown, including its heading line
+
+    @property
+    def words(self) -> int:
+        return len(self.text.split())
+
+
+def split_sections(markdown: str, max_level: int = 2) -> list[Section]:
+    """
+    Split a markdown report at headings of level <= max_level (deeper headings stay
+    inside their parent section). Headings inside fenced code blocks are ignored.
+    join_sections(split_sections(md)) == md.
+    """
+    sections: list[Section] = []
+    heading, lines, in_fence = "", [], False
+    for line in (markdown or "").splitlines(keepends=True):
+        if _FENCE.match(line):
+            in_fence = not in_fence
+        m = None if in_fence else _HEADING.match(line)
+        if m and len(m.group(1)) <= max_level:
+            if lines:
+                sections.append(Section(heading, "".join(lines)))
+            heading, lines = m.group(2), []
+        lines.append(line)
+    if lines:
+        sections.append(Section(heading, "".join(lines)))
+    return sections
+
+
+def join_sections(sections: list[Section]) -> str:
+    parts = [s.text for s in sections]
+    for i in range(len(parts) - 1):
+        if not parts[i].endswith("\n"):
+            parts[i] += "\n\n"  # a regenerated section may come back without a trailing newline
+    return "".join(parts)
@@ -0,0 +1,78 @@
+import re
+
+_SPECIAL = re.compile(r'["\\]')
+_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "b": "\b", "f": "\f"}
+
+
+class PartialReport(str):
+    """
+    An in-progress snapshot of the report markdown. Each one supersedes the previous,
+    so consumers may drop intermediate snapshots (status lines are plain str and are not droppable).
+    """
+
+
+class JsonFieldStream:
+    """
+    Incrementally decodes one top-level string field (e.g. "markdown_report") out of
+    structured-output JSON as it streams in, in O(total length).
+    """
+
+    def __init__(self, field: str):
+        self._key = re.compile(r'"%s"\s*:\s*"' % re.escape(field))
+        self._keep = len(field) + 32
+        self._pending = ""
+        self._started = False
+        self.done = False
+        self.value = ""
+
+    def feed(self, delta: str) -> bool:
+        """Consume a chunk of JSON text; returns True if the decoded value grew."""
+        if self.done:
+            return False
+        self._pending += delta
+        if not self._started:
+            m = self._key.search(self._pending)
+            if not m:
+                self._pending = self._pending[-self._keep:]
+                return False
+            self._started = True
+            self._pending = self._pending[m.end():]
+
+        text, n, i = self._pending, len(self._pending), 0
+        out = []
+        while i < n:
+            m = _SPECIAL.search(text, i)
+            if not m:
+                out.append(text[i:])
+                i = n
+                break
+            out.append(text[i:m.start()])
+            i = m.start()
+            if text[i] == '"':
+                self.done = True
+                i = n
+                break
+            if i + 1 >= n:
+                break  # escape split across chunks
+            esc = text[i + 1]
+            if esc != "u":
+                out.append(_ESCAPES.get(esc, esc))
+                i += 2
+                continue
+            if i + 6 > n:
+                break
+            code = int(text[i + 2:i + 6], 16)
+            if 0xD800 <= code < 0xDC00:
+                if i + 12 > n:
+                    break
+                if text[i + 6:i + 8] == "\\u":
+                    low = int(text[i + 8:i + 12], 16)
+                    out.append(chr(0x10000 + ((code - 0xD800) << 10) + (low - 0xDC00)))
+                    i += 12
+                    continue
+            out.append(chr(code))
+            i += 6
+        self._pending = text[i:]
+        chunk = "".join(out)
+        self.value += chunk
+        return bool(chunk)
@@ -1,22 +1,179 @@
-from agents import Runner, trace, gen_trace_id
-from search_agent import search_agent
-from planner_agent import planner_agent, WebSearchItem, WebSearchPlan
-from writer_agent import writer_agent, ReportData
-from evaluator_agent import evaluator_agent
-from eval_schema import EvaluationReport
-from build_eval_prompt import build_eval_prompt
+from agents import trace, gen_trace_id
+# Agent modules, not agents: each agent is built on first use (lazy_agents.py)
+import evaluator_agent
+import planner_agent
+import search_agent
+import writer_agent
+from planner_agent import WebSearchItem, WebSearchPlan
+from writer_agent import ReportData
+from eval_schema import EvalCriterionScore, EvaluationReport, JudgeScores, SectionScore
+from prompts import eval_prompt, render_sources, revise_prompt, writer_prompt
+from search_cache import SearchCache, search_cache
+from source_store import SearchResult, SourceStore, parse_search_output, source_store as shared_source_store
+from report_cache import CachedRun, ReportCache, report_cache as shared_report_cache
+from checkpoints import CheckpointStore, checkpoints as shared_checkpoints
+from scheduler import scheduler
+from model_router import router
+from report_stream import JsonFieldStream, PartialReport
+from report_sections import Section, join_sections, split_sections
+from report_analysis import SectionMetrics, analyze_report, analyze_section
+from metrics import RunMetrics
+from eval_policy import EvalPolicy, eval_policy as shared_eval_policy
+from context_packer import pack_context
+from deepening import (RESEARCH_ADAPTIVE, RESEARCH_COVERAGE_TARGET, RESEARCH_MAX_ROUNDS,
+                       RESEARCH_SEARCH_BUDGET, RoundStats, content_words, find_gaps, plan_size)
 
 import asyncio
 import math
 import re
-from collections import Counter
-from datetime import datetime, timezone
+import time
 from contextlib import nullcontext
 import os
 
+# Stop waiting on searches once SEARCH_QUORUM (fraction of those not served from the
+# search cache) have succeeded, or SEARCH_DEADLINE_S seconds after searching started;
+# stragglers are cancelled.
+# After the quorum, stragglers get SEARCH_QUORUM_GRACE times the time the quorum took.
+SEARCH_DEADLINE_S = float(os.getenv("SEARCH_DEADLINE_S", "30"))
+SEARCH_QUORUM = float(os.getenv("SEARCH_QUORUM", "0.8"))
+SEARCH_QUORUM_GRACE = float(os.getenv("SEARCH_QUORUM_GRACE", "0.5"))
+# Stream the writer's markdown to the UI as it is generated
+STREAM_REPORT = os.getenv("STREAM_REPORT", "1") != "0"
+# Pipelined writing: draft from the first PIPELINE_FIRST_RESULTS searches while the
+# rest finish, then merge the later results into their sections during evaluation
+PIPELINE_WRITING = os.getenv("PIPELINE_WRITING", "0") == "1"
+PIPELINE_FIRST_RESULTS = int(os.getenv("PIPELINE_FIRST_RESULTS", "2"))
+
+# Quality thresholds. A section is regenerated if it fails MIN_OVERALL or MIN_COV or
+# cites a source that does not exist (VALID_CITES); MIN_DIV and MAX_AGE are
+# source-level and only reported.
+MIN_OVERALL = 4.0
+MIN_COV = 0.60
+MIN_DIV = 0.50
+MAX_AGE = 180  # days
+# Criteria the evaluator scores (evaluator_agent.py), for reports with nothing to judge
+_CRITERIA = ("Faithfulness", "Relevance & Completeness", "Structure & Citations")
+# Sections shorter than this (titles, one-line transitions) are not sent to the judge
+SECTION_MIN_WORDS = int(os.getenv("SECTION_MIN_WORDS", "40"))
+# Token budget for the research notes sent with a single-section revision
+SECTION_CONTEXT_TOKENS = int(os.getenv("SECTION_CONTEXT_TOKENS", "800"))
+
+# Section-writer feedback when merging later search results into a drafted section
+_MERGE_FEEDBACK = (
+    "- Work the findings in the research notes into this section, citing them with their [n] numbers.\n"
+    "- Keep the existing content and citations unless the new notes contradict them."
+)
+
+# Inline [n] markers written in place of a summary's citation links
+_MARKER_PARENS = re.compile(r"\(\s*((?:\[\d+\])+)\s*\)")
+_MARKER_AFTER_STOP = re.compile(r"([.!?])\s*((?:\[\d+\])+)")
+
+
+def _coverage_advice(cov: float) -> str:
+    return f"Only {cov:.0%} of sentences carry an inline [n] citation; cite every non-obvious fact."
+
+
+def _citation_advice(check: SectionMetrics, num_sources: int) -> list[str]:
+    """Fixes for what the local checks found in one section (empty if it passes them)."""
+    advice = [_coverage_advice(check.coverage)] if check.coverage < MIN_COV else []
+    if check.invalid_citations:
+        cited = ", ".join(f"[{n}]" for n in check.invalid_citations)
+        advice.append(f"{cited} match no source; only [1]–[{num_sources}] exist.")
+    if check.malformed_citations:
+        advice.append("Cite one source per bracket, e.g. [1][2], not [1, 2] or [1-3].")
+    return advice
+
+
+def _checks_pass(check: SectionMetrics) -> bool:
+    return check.coverage >= MIN_COV and not check.invalid_citations and not check.malformed_citations
+
+
+def _assign_notes(sections: list[Section], notes: list[tuple[list[int], str]],
+                  judge_min: int) -> dict[int, list[tuple[list[int], str]]]:
+    """
+    Section index -> the notes to merge into it: each note goes to the judged section
+    (at least judge_min words) it shares the most content words with, so every merge
+    is checked by the judge. A draft with no such section gets a new one, appended to
+    `sections`, that the notes are written into.
+    """
+    judged = [i for i, sec in enumerate(sections) if sec.words >= judge_min]
+    if notes and not judged:
+        sections.append(Section("Further findings", "## Further findings\n"))
+        judged = [len(sections) - 1]
+    vocab = {i: set(content_words(sections[i].text)) for i in judged}
+    assigned: dict[int, list[tuple[list[int], str]]] = {}
+    for note in notes:
+        words = set(content_words(note[1]))
+        best = max(judged, key=lambda i: len(words & vocab[i]))
+        assigned.setdefault(best, []).append(note)
+    return assigned
+
+
+def _incorporated(sources: list[dict], start: int = 0) -> str:
+    """'sources [start+1]–[n]: domain, ...' for the sources from index `start` on."""
+    new = sources[start:]
+    if not new:
+        return "no new sources"
+    span = f"[{start + 1}]" if len(new) == 1 else f"[{start + 1}]–[{len(sources)}]"
+    domains = list(dict.fromkeys(s["domain"] for s in new if s.get("domain")))
+    listed = ", ".join(domains[:5]) + (", …" if len(domains) > 5 else "")
+    return f"sources {span}" + (f": {listed}" if listed else "")
+
+
+def _cited_text(summary: str, start: int) -> str:
+    """The sentence a citation at `start` supports, as the source's snippet."""
+    head = summary[:start].rstrip(" (")
+    sentences = [s for s in re.split(r"(?<=[.!?])\s+|\n+", head) if s.strip()]
+    return sentences[-1].strip()[:400] if sentences else ""
+
 
 class ResearchManager:
 
+    def __init__(
+        self,
+        cache: SearchCache | None = None,
+        report_cache: ReportCache | None = None,
+        source_store: SourceStore | None = None,
+        policy: EvalPolicy | None = None,
+        checkpoints: CheckpointStore | None = None,
+        adaptive: bool = RESEARCH_ADAPTIVE,
+        search_budget: int = RESEARCH_SEARCH_BUDGET,
+        max_rounds: int = RESEARCH_MAX_ROUNDS,
+        search_deadline: float = SEARCH_DEADLINE_S,
+        search_quorum: float = SEARCH_QUORUM,
+        search_grace: float = SEARCH_QUORUM_GRACE,
+        stream_report: bool = STREAM_REPORT,
+        pipeline_writing: bool = PIPELINE_WRITING,
+        first_results: int = PIPELINE_FIRST_RESULTS,
+    ):
+        self.cache = cache or search_cache
+        self.report_cache = report_cache or shared_report_cache
+        self.source_store = source_store or shared_source_store
+        self.policy = policy or shared_eval_policy
+        self.checkpoints = checkpoints or shared_checkpoints
+        self.adaptive = adaptive
+        self.search_budget = search_budget
+        self.max_rounds = max_rounds
+        self.search_deadline = search_deadline
+        self.search_quorum = search_quorum
+        self.search_grace = search_grace
+        self.stream_report = stream_report
+        self.pipeline_writing = pipeline_writing
+        self.first_results = first_results
+        # Outputs of the last run(), for callers that need more than the status stream
+        self.dropped_searches: list[WebSearchItem] = []
+        self.dropped_reason: str | None = None  # "quorum" or "deadline"
+        self.report: ReportData | None = None
+        self.eval_report: EvaluationReport | None = None
+        self.sources: list[dict] = []
+        self.notes: list[tuple[list[int], str]] = []  # (source numbers, summary with [n] markers) per search
+        self.late_notes: list[tuple[list[int], str]] = []  # notes of searches that finished after the draft started
+        self.reused: CachedRun | None = None  # similar past run this one was served from
+        self.rounds: list[RoundStats] = []
+        self._rendered_sources: tuple[list[dict], str] | None = None
+        self.timings: dict[str, float] = {}  # seconds per stage
+        self.metrics = RunMetrics()
+
     async def run(self, query: str):
         """Run the deep research process, yielding status updates and the final report"""
         trace_id = gen_trace_id()
@@ -34,204 +191,682 @@ class ResearchManager:
                 yield "Tracing disabled for this run."
 
             print("Starting research...")
-
-            search_plan = await self.plan_searches(query)
-            yield "Searches planned, starting to search..."
-
-            search_results = await self.perform_searches(search_plan)
-            yield "Searches complete, writing report..."
-
-            # Build minimal 'sources' from search results (upgrade when your search tool returns real URLs/meta)
-            sources = self._build_sources_from_results(search_plan, search_results)
-
-            report = await self.write_report(query, search_results, sources)
-            yield "Report written, evaluating quality..."
-
-            report, eval_report = await self.evaluate_and_maybe_revise(query, report, sources)
-            yield f"Evaluation done (overall: {eval_report.overall:.1f}). Research complete."
-
-            yield report.markdown_report
+            self.timings = {}
+            self.metrics = RunMetrics()
+            try:
+                async for chunk in self._research(query):
+                    yield chunk
+            except (GeneratorExit, asyncio.CancelledError):
+                self.metrics.finish("cancelled")
+                raise
+            except Exception:
+                self.metrics.finish("error")
+                raise
+            self.metrics.finish("ok")
+
+    async def _research(self, query: str):
+        """The pipeline stages behind run(), without tracing and run bookkeeping"""
+        run_start = stage_start = time.perf_counter()
+        self.dropped_searches = []
+
+        cached = self.reused = await self.report_cache.lookup(query)
+        if cached and cached.similarity >= self.report_cache.hit_similarity:
+            # Near-identical question: serve the stored report and its scores
+            self.report = ReportData.model_validate(cached.value["report"])
+            self.eval_report = EvaluationReport.model_validate(cached.value["eval"])
+            self.sources = cached.value["sources"]
+            self._record_stage("total", run_start)
+            yield (f"Found a report for a near-identical question ({cached.query!r}, "
+                   f"similarity {cached.similarity:.2f}); reusing it.")
+            yield self.report.markdown_report
+            return
+
+        # Stages a previous, interrupted run of this query already finished (see checkpoints.py)
+        checkpoint = {} if cached else self.checkpoints.load(query)
+        resume = checkpoint.get("stages", {})
+        round_no = checkpoint.get("round", 1)
+        drafted = None  # first-round draft written while searching (pipeline_writing)
+        if cached:
+            # Similar question: its searches still apply, only the report is rewritten
+            search_plan = WebSearchPlan.model_validate(cached.value["plan"])
+            search_results = [self._as_search_result(value) for value in cached.value["search_results"]]
+            self._checkpoint_searches(query, search_plan, search_results)
+            yield (f"Reusing searches from a similar question ({cached.query!r}, "
+                   f"similarity {cached.similarity:.2f}), writing report...")
+        elif "search" in resume:
+            search_plan = WebSearchPlan.model_validate(resume["search"]["plan"])
+            search_results = [self._as_search_result(value) for value in resume["search"]["results"]]
+            yield (f"Resuming an interrupted run: {len(search_results)} searches already done "
+                   f"(round {round_no}), writing report...")
+        else:
+            if "plan" in resume:
+                search_plan = WebSearchPlan.model_validate(resume["plan"])
+                yield "Resuming an interrupted run: searches already planned, starting to search..."
+            else:
+                search_plan = await self.plan_searches(query, plan_size(query, self.search_budget) if self.adaptive else None)
+                stage_start = self._record_stage("plan", stage_start)
+                self.checkpoints.save(query, "plan", search_plan.model_dump())
+                yield "Searches planned, starting to search..."
+
+            if self.pipeline_writing:
+                search_results = []
+                async for chunk in self._write_while_searching(query, search_plan, search_results):
+                    yield chunk
+                drafted = self.report
+            else:
+                search_results = await self.perform_searches(search_plan)
+                stage_start = self._record_stage("search", stage_start)
+                self._checkpoint_searches(query, search_plan, search_results)
+                if self.dropped_searches:
+                    dropped = "; ".join(item.query for item in self.dropped_searches)
+                    yield f"Searches complete ({self._dropped_note()}: {dropped}), writing report..."
+                else:
+                    yield "Searches complete, writing report..."
+
+        # Rounds: write + evaluate from all results so far; in adaptive mode, search the
+        # sub-questions the notes don't cover yet and go again (see deepening.py)
+        self.rounds = []
+        round_start, round_searches, new_results = run_start, len(search_plan.searches), search_results
+        searched = {item.query.strip().lower() for item in search_plan.searches}
+        spent = len(search_plan.searches)
+        while True:
+            sources, self.notes = await self.build_sources(search_results)
+            new_sources = len(sources) - len(self.sources) if round_no > 1 else len(sources)
+            self.sources = sources
+            print(f"{len(sources)} cited sources from {len(search_results)} searches")
+
+            if "eval" in resume:
+                report = ReportData.model_validate(resume["eval"]["report"])
+                eval_report = EvaluationReport.model_validate(resume["eval"]["eval"])
+                yield "Resuming an interrupted run: report already written and evaluated."
+            else:
+                late_notes = []
+                if drafted is not None:
+                    report, drafted, late_notes = drafted, None, self.late_notes
+                    # The late notes are merged during evaluation, so a resumed run needs them too
+                    self.checkpoints.save(query, "draft", {**report.model_dump(), "late_notes": late_notes},
+                                          round_no)
+                    yield ("Evaluating quality..."
+                           + (f"\n\n---\n\n{report.markdown_report}" if self.stream_report else ""))
+                elif "draft" in resume:
+                    report = ReportData.model_validate(resume["draft"])
+                    late_notes = [(list(numbers), text) for numbers, text in resume["draft"].get("late_notes", [])]
+                    yield ("Resuming an interrupted run from its draft, evaluating quality..."
+                           + (f"\n\n---\n\n{report.markdown_report}" if self.stream_report else ""))
+                elif self.stream_report:
+                    async for partial in self.write_report_streamed(query, self.notes, sources):
+                        yield partial
+                    report = self.report
+                    self._record_stage("write", stage_start)
+                    self.checkpoints.save(query, "draft", report.model_dump(), round_no)
+                    # Keep the draft on screen while it is being evaluated
+                    yield f"Report written, evaluating quality...\n\n---\n\n{report.markdown_report}"
+                else:
+                    report = await self.write_report(query, self.notes, sources)
+                    self._record_stage("write", stage_start)
+                    self.checkpoints.save(query, "draft", report.model_dump(), round_no)
+                    yield "Report written, evaluating quality..."
+
+                report, eval_report = await self.evaluate_and_maybe_revise(query, report, sources, late_notes)
+                self.checkpoints.save(query, "eval", {"report": report.model_dump(), "eval": eval_report.model_dump()},
+                                      round_no)
+            resume = {}
+            stats = RoundStats(round=round_no, searches=round_searches, succeeded=len(new_results),
+                               sources=len(sources), new_sources=new_sources,
+                               seconds=time.perf_counter() - round_start, overall=eval_report.overall)
+            self.rounds.append(stats)
+            if not self.adaptive:
+                self.metrics.round(stats.as_dict())
+                break
+
+            candidates = list(report.follow_up_questions) + [
+                f"{query}: {score.heading}" for score in eval_report.sections if not score.passed and score.heading
+            ]
+            gaps, stats.coverage = find_gaps(candidates, "\n".join(text for _, text in self.notes), searched)
+            stats.gaps = gaps
+            self.metrics.round(stats.as_dict())
+            budget_left = self.search_budget - spent
+            if stats.coverage >= RESEARCH_COVERAGE_TARGET or not gaps or budget_left <= 0 \
+                    or round_no >= self.max_rounds:
+                break
+
+            items = [WebSearchItem(reason=f"Not covered after round {round_no}", query=gap) for gap in gaps[:budget_left]]
+            round_no += 1
+            round_start = stage_start = time.perf_counter()
+            yield (f"Coverage {stats.coverage:.0%} after round {round_no - 1}; "
+                   f"round {round_no}: searching {len(items)} uncovered sub-question(s)...")
+            try:
+                new_results = await self.perform_searches(WebSearchPlan(searches=items))
+            except RuntimeError as e:
+                print(f"Round {round_no} found nothing, keeping the round {round_no - 1} report: {e}")
+                break
+            stage_start = self._record_stage("search", stage_start)
+            search_plan = WebSearchPlan(searches=search_plan.searches + items)
+            search_results = search_results + new_results
+            searched |= {item.query.strip().lower() for item in items}
+            spent += len(items)
+            self._checkpoint_searches(query, search_plan, search_results, round_no)
+            round_searches = len(items)
+            yield f"Round {round_no} searches complete, rewriting report..."
+
+        self._record_stage("total", run_start)
+        self.report, self.eval_report = report, eval_report
+        await self.report_cache.put(query, {
+            "plan": search_plan.model_dump(),
+            "search_results": [result.model_dump() for result in search_results],
+            "sources": sources,
+            "report": report.model_dump(),
+            "eval": eval_report.model_dump(),
+        })
+        self.checkpoints.clear(query)
+        yield f"Evaluation done (overall: {eval_report.overall:.1f}). Research complete."
+
+        yield report.markdown_report
+
+    def _checkpoint_searches(self, query: str, plan: WebSearchPlan, results: list[SearchResult],
+                             round_no: int = 1) -> None:
+        self.checkpoints.save(query, "search", {
+            "plan": plan.model_dump(),
+            "results": [result.model_dump() for result in results],
+        }, round_no)
+
+    def _record_stage(self, stage: str, start: float) -> float:
+        now = time.perf_counter()
+        self.timings[stage] = self.timings.get(stage, 0.0) + now - start
+        self.metrics.stage(stage, now - start)
+        return now
+
+    async def _run_agent(self, stage: str, agent, input):
+        """router.run (scheduler.run, hedged for latency-critical stages) plus latency / token / cost accounting"""
+        start = time.perf_counter()
+        try:
+            routed = await router.run(stage, agent, input)
+        except Exception:
+            self.metrics.call_failed(stage)
+            raise
+        seconds = time.perf_counter() - start
+        # Book the call against the model that answered, and what the losing hedge cost
+        self.metrics.call(stage, routed.agent, routed.result, seconds)
+        for loser, loser_seconds, loser_result in routed.losers:
+            self.metrics.hedge_loser(stage, loser, routed.result, loser_result, loser_seconds, seconds)
+        return routed.result
 
     # ---------- Planning & Search ----------
 
-    async def plan_searches(self, query: str) -> WebSearchPlan:
-        """Plan the searches to perform for the query"""
+    async def plan_searches(self, query: str, size: int | None = None) -> WebSearchPlan:
+        """Plan the searches to perform for the query (`size` of them, else the planner's default)"""
         print("Planning searches...")
-        result = await Runner.run(planner_agent, f"Query: {query}")
+        planner_input = f"Query: {query}" + (f"\nNumber of searches: {size}" if size else "")
+        result = await self._run_agent("plan", planner_agent.planner_agent, planner_input)
         plan = result.final_output_as(WebSearchPlan)
+        if size:
+            plan.searches = plan.searches[:size]
         print(f"Will perform {len(plan.searches)} searches")
         return plan
 
-    async def perform_searches(self, search_plan: WebSearchPlan) -> list[str]:
-        """Perform the searches for the query"""
+    async def perform_searches(self, search_plan: WebSearchPlan) -> list[SearchResult]:
+        """
+        Perform the searches for the query.
+        Returns once the quorum is met (plus its grace window) or the deadline passes;
+        unfinished searches are cancelled and recorded in self.dropped_searches, with
+        the reason in self.dropped_reason.
+        """
+        return [result async for result in self.iter_searches(search_plan)]
+
+    async def iter_searches(self, search_plan: WebSearchPlan):
+        """perform_searches() as an async generator: cache hits first, then each search as it completes."""
         print("Searching...")
-        tasks = [asyncio.create_task(self.search(item)) for item in search_plan.searches]
-        results = []
-        num_completed = 0
-        for task in asyncio.as_completed(tasks):
-            result = await task
-            if result is not None:
-                results.append(result)
-            num_completed += 1
-            print(f"Searching... {num_completed}/{len(tasks)} completed")
+        self.dropped_searches, self.dropped_reason = [], None
+        cached = await self.cache.get_many([item.query for item in search_plan.searches])
+        hits = [self._as_search_result(cached[item.query], item.query)
+                for item in search_plan.searches if item.query in cached]
+        misses = [item for item in search_plan.searches if item.query not in cached]
+        print(f"Search cache: {len(hits)} hits, {len(misses)} misses")
+        for result in hits:
+            yield result
+
+        total = len(search_plan.searches)
+        # The quorum counts live searches only: cache hits cost nothing to wait for, and
+        # counting them would start the grace window before any search had run
+        needed = max(1, math.ceil(self.search_quorum * len(misses))) if misses else 0
+        found = num_completed = len(hits)
+        live = 0
+        tasks = {asyncio.create_task(self.search(item)): item for item in misses}
+        pending = set(tasks)
+        reason, quorum_met = "deadline", False
+        try:
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            stop = started + self.search_deadline
+            while pending:
+                if live >= needed and not quorum_met:
+                    # Quorum met: let the stragglers finish if they are only a little behind
+                    quorum_met = True
+                    grace_end = loop.time() + self.search_grace * (loop.time() - started)
+                    if grace_end < stop:
+                        stop, reason = grace_end, "quorum"
+                timeout = stop - loop.time()
+                if timeout <= 0:
+                    break
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    num_completed += 1
+                    print(f"Searching... {num_completed}/{total} completed")
+                    result = task.result()
+                    if result is not None:
+                        found += 1
+                        live += 1
+                        yield result
+        finally:
+            if pending:
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+                self.dropped_searches, self.dropped_reason = [tasks[task] for task in pending], reason
+                print(f"{self._dropped_note().capitalize()}: {[item.query for item in self.dropped_searches]}")
         print("Finished searching")
-        return results
+        if total and not found:
+            raise RuntimeError("All searches failed or timed out; not writing a report without sources.")
 
-    async def search(self, item: WebSearchItem) -> str | None:
-        """Perform a search for a single item"""
+    def _dropped_note(self) -> str:
+        n = len(self.dropped_searches)
+        if self.dropped_reason == "quorum":
+            return f"{n} cancelled after the quorum was met"
+        return f"{n} timed out at the {self.search_deadline:g}s deadline"
+
+    async def search(self, item: WebSearchItem) -> SearchResult | None:
+        """Perform a search for a single item; its cited pages go to the source store"""
         _input = f"Search term: {item.query}\nReason for searching: {item.reason}"
         try:
-            result = await Runner.run(search_agent, _input)
-            return str(result.final_output)
-        except Exception:
+            result = await self._run_agent("search", search_agent.search_agent, _input)
+        except Exception as e:
+            print(f"Search failed for {item.query!r}: {e.__class__.__name__}: {e}")
             return None
+        search_result, sources = parse_search_output(item.query, result)
+        await self.source_store.put_many(sources)
+        await self.cache.put(item.query, search_result.model_dump())
+        return search_result
+
+    @staticmethod
+    def _as_search_result(value, query: str = "") -> SearchResult:
+        # Entries cached before sources were captured are bare summary strings
+        if isinstance(value, str):
+            return SearchResult(query=query, summary=value)
+        return SearchResult.model_validate(value)
+
+    async def build_sources(self, search_results: list[SearchResult]) -> tuple[list[dict], list[tuple[list[int], str]]]:
+        """
+        Number the cited pages in order of first citation (deduplicated across searches)
+        and rewrite each summary's citation spans as inline [n] markers.
+        Returns the sources list and one (source numbers, marked-up summary) note per search.
+        """
+        stored = await self.source_store.get_many([c.source_id for r in search_results for c in r.citations])
+        numbers: dict[str, int] = {}
+        sources: list[dict] = []
+        notes: list[tuple[list[int], str]] = []
+        for result in search_results:
+            text = result.summary
+            spans: dict[tuple[int, int], list[int]] = {}
+            for c in sorted(result.citations, key=lambda c: (c.start, c.end)):
+                source = stored.get(c.source_id)
+                if source is None:
+                    continue
+                if c.source_id not in numbers:
+                    numbers[c.source_id] = len(sources) + 1
+                    sources.append({
+                        "url": source.url,
+                        "title": source.title,
+                        "domain": source.domain,
+                        "published_at": source.published_at,
+                        "snippet": _cited_text(text, c.start),
+                    })
+                spans.setdefault((c.start, c.end), []).append(numbers[c.source_id])
+            cut = len(text)
+            for (start, end), nums in sorted(spans.items(), reverse=True):
+                if end > cut:
+                    continue  # overlaps a span already replaced
+                marker = "".join(f"[{n}]" for n in dict.fromkeys(nums))
+                text = text[:start] + marker + text[end:]
+                cut = start
+            text = _MARKER_PARENS.sub(r"\1", text)
+            text = _MARKER_AFTER_STOP.sub(r"\2\1", text)
+            notes.append((list(dict.fromkeys(n for nums in spans.values() for n in nums)), text))
+        return sources, notes
 
     # ---------- Writing ----------
 
-    async def write_report(self, query: str, search_results: list[str], sources: list[dict]) -> ReportData:
+    async def write_report(self, query: str, notes: list[tuple[list[int], str]], sources: list[dict]) -> ReportData:
         """Write the report for the query"""
         print("Thinking about report...")
-        # Provide sources list to encourage citations like [1], [2]
-        sources_block = "\n".join(
-            f"[{i+1}] {(s.get('title') or s.get('url') or f'Source {i+1}')} — {s.get('url','')}"
-            for i, s in enumerate(sources)
-        )
-        _input = (
-            f"Original query: {query}\n"
-            f"Summarized search results: {search_results}\n\n"
-            f"Sources (for inline [n] citations):\n{sources_block}"
-        )
-        result = await Runner.run(writer_agent, _input)
+        result = await self._run_agent("write", writer_agent.writer_agent, self._writer_input(query, notes, sources))
         print("Finished writing report")
-        return result.final_output_as(ReportData)
+        self.report = result.final_output_as(ReportData)
+        return self.report
+
+    async def write_report_streamed(self, query: str, notes: list[tuple[list[int], str]], sources: list[dict]):
+        """
+        Write the report with the streaming runner, yielding a PartialReport each time
+        the markdown grows. The finished ReportData is stored on self.report.
+        """
+        print("Thinking about report (streaming)...")
+        start = time.perf_counter()
+        stream = scheduler.run_streamed(writer_agent.writer_agent, self._writer_input(query, notes, sources))
+        markdown = JsonFieldStream("markdown_report")
+        async for event in stream:
+            if event.type != "raw_response_event":
+                continue
+            if getattr(event.data, "type", "") == "response.output_text.delta" and markdown.feed(event.data.delta):
+                yield PartialReport(markdown.value)
+        print("Finished writing report")
+        self.metrics.call("write", writer_agent.writer_agent, stream.result, time.perf_counter() - start)
+        self.report = stream.result.final_output_as(ReportData)
+
+    async def _write_while_searching(self, query: str, search_plan: WebSearchPlan, search_results: list[SearchResult]):
+        """
+        Pipelined first round: the writer drafts from the first `first_results` searches
+        while the rest keep running. Results are appended to `search_results` in arrival
+        order; build_sources numbers sources in that order, so the draft's [n] stay valid
+        as sources are added. The notes of the searches that finished after the draft
+        started are left on self.late_notes for evaluate_and_maybe_revise, which merges
+        them into their sections while the rest of the report is being judged.
+        Yields status lines and draft PartialReports; the draft is left on self.report.
+        """
+        start = time.perf_counter()
+        total = len(search_plan.searches)
+        enough = asyncio.Event()
+
+        async def collect():
+            try:
+                async for result in self.iter_searches(search_plan):
+                    search_results.append(result)
+                    if len(search_results) >= self.first_results:
+                        enough.set()
+            finally:
+                enough.set()
+                self._record_stage("search", start)
+
+        collector = asyncio.create_task(collect())
+        try:
+            await enough.wait()
+            if collector.done():
+                await collector  # raises if every search failed
+            drafted = len(search_results)
+            sources, notes = await self.build_sources(search_results[:drafted])
+            write_start = time.perf_counter()
+            running = f" while {total - drafted} more finish" if drafted < total else ""
+            yield f"Drafting from {drafted}/{total} searches ({_incorporated(sources)}){running}..."
+            if self.stream_report:
+                async for partial in self.write_report_streamed(query, notes, sources):
+                    yield partial
+            else:
+                await self.write_report(query, notes, sources)
+            self._record_stage("write", write_start)
+            await collector
+        finally:
+            if not collector.done():
+                collector.cancel()
+                await asyncio.gather(collector, return_exceptions=True)
+        self._checkpoint_searches(query, search_plan, search_results)
+        all_sources, all_notes = await self.build_sources(search_results)
+        self.late_notes = all_notes[drafted:]
+        dropped = f"; {self._dropped_note()}" if self.dropped_searches else ""
+        later = (f"; {len(search_results) - drafted} later search(es) will be merged during evaluation "
+                 f"({_incorporated(all_sources, len(sources))})") if self.late_notes else ""
+        yield f"Draft complete from {drafted}/{total} searches ({_incorporated(sources)}{dropped}){later}."
+
+    async def _merge_section(self, query: str, section: Section, notes: list[tuple[list[int], str]],
+                             sources: list[dict]) -> str:
+        """Work later search notes into one drafted section; returns it unchanged if the merge fails."""
+        packed = pack_context(f"{section.heading} {query}", notes, budget=SECTION_CONTEXT_TOKENS)
+        writer_input = revise_prompt(self._sources_block(sources), section.text, packed.text, _MERGE_FEEDBACK, query)
+        try:
+            result = await self._run_agent("merge", writer_agent.section_writer_agent, writer_input)
+        except Exception as e:
+            print(f"Merge into {section.heading or 'Introduction'!r} failed, keeping it as drafted: "
+                  f"{e.__class__.__name__}: {e}")
+            return section.text
+        return self._section_output(section, result)
+
+    def _writer_input(self, query: str, notes: list[tuple[list[int], str]], sources: list[dict]) -> str:
+        # Deduplicated, relevance-ranked notes within the token budget, each tagged with
+        # its [n] sources, then the sources list to encourage citations like [1], [2]
+        packed = pack_context(query, notes)
+        print(f"Packed {packed.kept} note sentences ({packed.tokens} tokens; "
+              f"{packed.duplicates} duplicates merged, {packed.over_budget} over budget)")
+        return writer_prompt(self._sources_block(sources), packed.text, query)
+
+    def _sources_block(self, sources: list[dict]) -> str:
+        # Rendered once per round: the writer, judges and revisions share it verbatim (see prompts.py)
+        if self._rendered_sources is None or self._rendered_sources[0] is not sources:
+            self._rendered_sources = (sources, render_sources(sources))
+        return self._rendered_sources[1]
 
     # ---------- Evaluation & Revision ----------
 
-    async def evaluate_and_maybe_revise(self, query: str, report: ReportData, sources: list[dict]) -> tuple[ReportData, EvaluationReport]:
+    async def evaluate_and_maybe_revise(self, query: str, report: ReportData, sources: list[dict],
+                                        late_notes: list[tuple[list[int], str]] = ()) -> tuple[ReportData, EvaluationReport]:
         """
-        1) Call EvaluatorAgent using build_eval_prompt
-        2) Run minimal deterministic checks
-        3) If scores are low, invoke a single revision pass with WriterAgent
+        Score every section and regenerate the failing ones, each section independently
+        and in parallel, as self.policy directs (see eval_policy.py):
+        1) Local citation checks first (report_analysis.py); with fast_fail a section
+           under MIN_COV or citing a missing source is revised without waiting on the judge
+        2) Otherwise the EvaluatorAgent judges it (with speculative, while a revision is
+           already being written) and a failing section is revised
+        3) Revised sections are re-judged per policy.final; scores are aggregated word-weighted
+        `late_notes` (pipelined writing) are merged into the sections they belong to while
+        those sections are judged; see _assess_section.
         """
-        # 1) LLM-as-judge
-        eval_input = build_eval_prompt(query, report.markdown_report, sources)
-        eval_res = await Runner.run(evaluator_agent, eval_input)
-        eval_report: EvaluationReport = eval_res.final_output_as(EvaluationReport)
+        stage_start = time.perf_counter()
+        sections = split_sections(report.markdown_report)
+        judge_min = SECTION_MIN_WORDS if any(sec.words >= SECTION_MIN_WORDS for sec in sections) else 0
+        assigned = _assign_notes(sections, list(late_notes), judge_min)
+        outcomes = await asyncio.gather(
+            *(self._assess_section(query, sec, sources, judge_min, assigned.get(i)) for i, sec in enumerate(sections))
+        )
+        first_pass = [first for first, _, _ in outcomes]
+        scored = [final for _, final, _ in outcomes]
+        changed = [i for i, (_, _, text) in enumerate(outcomes) if text is not None]  # revised or merged
+        for i in changed:
+            sections[i] = Section(sections[i].heading, outcomes[i][2])
+        revised = [i for i in changed if scored[i][0].revised]
+
+        if revised and not any(judge for _, judge in scored):
+            # Every judged section was fast-failed and not re-judged, but report scores need
+            # at least one judged section whatever policy.final says: judge the longest
+            i = max(revised, key=lambda i: sections[i].words)
+            score, judge = await self._score_section(query, sections[i], sources)
+            scored[i] = (score.model_copy(update={"revised": True}), judge)
+
+        if changed:
+            report = report.model_copy(update={"markdown_report": join_sections(sections)})
+        # One pass over the final report for the summary line, plus the source-level checks
+        final = analyze_report(report.markdown_report, sources)
+        age = final.median_age_days
+        self.metrics.evaluation(
+            self._failed_thresholds(first_pass, final.domain_diversity, age),
+            sections_passed=len(sections) - len(revised),
+            sections_failed=len(revised),
+        )
+        self._record_stage("evaluate", stage_start)
 
-        # 2) Cheap deterministic checks
-        cov = self._citation_coverage(report.markdown_report)
-        div = self._source_diversity([s.get("url", "") for s in sources])
-        age = self._median_source_age_days([s.get("published_at") for s in sources])
+        eval_report = self._aggregate_scores(scored)
 
         # Attach brief metrics to a short summary if available
         try:
             report.short_summary += (
                 f"\n\n_Eval:_ overall {eval_report.overall:.1f}/5 • "
-                f"cov {cov:.2f} • div {div:.2f} • age_med {('∞' if age == math.inf else int(age))}d"
+                f"cov {final.coverage:.2f} • div {final.domain_diversity:.2f} • "
+                f"age_med {('∞' if age == math.inf else int(age))}d • "
+                f"uncited {len(final.unused_sources)}/{final.sources} sources • "
+                f"revised {len(revised)}/{len(sections)} sections"
             )
         except Exception:
             pass
 
-        # 3) Decide if a revision is needed
-        MIN_OVERALL = 4.0
-        MIN_COV = 0.60
-        MIN_DIV = 0.50
-        MAX_AGE = 180  # days
-
-        needs_revision = (
-            eval_report.overall < MIN_OVERALL
-            or cov < MIN_COV
-            or div < MIN_DIV
-            or (age != math.inf and age > MAX_AGE)
-        )
-
-        if not needs_revision:
-            return report, eval_report
-
-        # Build concise feedback from evaluator recommendations
-        feedback_lines = "\n".join(
-            f"- {r}" for r in (getattr(eval_report, "recommendations", None) or [])
-        ) or "- Tighten unsupported claims and add/repair [n] citations for non-obvious facts."
-
-        revise_prompt = (
-            "Revise the draft to address these issues. Keep markdown. "
-            "Only keep claims supported by the provided sources. "
-            "Attach inline numeric citations like [1], [2] for all non-obvious facts.\n\n"
-            f"Issues:\n{feedback_lines}"
-        )
-
-        # Re-run writer once with feedback
-        sources_block = "\n".join(
-            f"[{i+1}] {(s.get('title') or s.get('url') or f'Source {i+1}')} — {s.get('url','')}"
-            for i, s in enumerate(sources)
-        )
-        writer_input = (
-            f"Original query: {query}\n\n"
-            f"Feedback:\n{revise_prompt}\n\n"
-            f"Draft:\n{report.markdown_report}\n\n"
-            f"Sources (for inline [n] citations):\n{sources_block}"
-        )
-        writer_res2 = await Runner.run(writer_agent, writer_input)
-        revised = writer_res2.final_output_as(ReportData)
+        return report, eval_report
 
-        # (Optional) quick second evaluation
-        eval_input2 = build_eval_prompt(query, revised.markdown_report, sources)
-        eval_res2 = await Runner.run(evaluator_agent, eval_input2)
-        eval_report2: EvaluationReport = eval_res2.final_output_as(EvaluationReport)
-
-        return revised, eval_report2
-
-    # ---------- Helpers ----------
-
-    def _build_sources_from_results(self, search_plan: WebSearchPlan, search_results: list[str]) -> list[dict]:
+    async def _assess_section(
+        self, query: str, section: Section, sources: list[dict], judge_min: int,
+        late_notes: list[tuple[list[int], str]] | None = None,
+    ) -> tuple[SectionScore, tuple[SectionScore, JudgeScores | None], str | None]:
         """
-        Temporary shim: creates 'sources' entries from the summaries produced by SearchAgent.
-        Replace this with real metadata (url/title/date/snippet) when your search tool exposes it.
+        One section's first-pass score, final (score, judge) and revised text (None if kept).
+        With late_notes the merge runs alongside the judge. If the draft passes, the merged
+        text replaces it when it still passes the local checks, scored by that verdict
+        (the merge only adds cited findings to a section the judge accepted). If it fails,
+        the merge is dropped: the revision is written from all notes, the late ones included.
         """
-        sources: list[dict] = []
-        for i, summary in enumerate(search_results, start=1):
-            q = search_plan.searches[i - 1].query if i - 1 < len(search_plan.searches) else f"Search {i}"
-            sources.append({
-                "url": f"https://example.com/search/{i}",  # TODO: real URL from search results
-                "title": f"Notes for: {q}",
-                "published_at": None,
-                "snippet": summary[:400] if summary else "",
-            })
-        return sources
-
-    def _citation_coverage(self, markdown: str) -> float:
-        sents = re.split(r'(?<=[.!?])\s+', markdown or "")
-        sents = [s for s in sents if s.strip()]
-        cited = sum(1 for s in sents if re.search(r'\[(\d+)\]', s))
-        return 0.0 if not sents else cited / len(sents)
-
-    def _source_diversity(self, urls: list[str]) -> float:
-        if not urls:
-            return 0.0
-        domains = []
-        for u in urls:
+        check = analyze_section(section.text, len(sources))
+        if section.words < judge_min and not late_notes:
+            score = SectionScore(heading=section.heading, words=section.words, coverage=check.coverage,
+                                 invalid_citations=check.invalid_citations)
+            return score, (score, None), None
+
+        if self.policy.fast_fail and not _checks_pass(check):
+            self.metrics.eval_decision("fast_fail")
+            judge = None
+            first = SectionScore(heading=section.heading, words=section.words, coverage=check.coverage,
+                                 invalid_citations=check.invalid_citations,
+                                 recommendations=_citation_advice(check, len(sources)), passed=False)
+            text = await self._revise_section(query, section, first, sources)
+        else:
+            speculative = merge = None
+            if late_notes:
+                merge = asyncio.create_task(self._merge_section(query, section, late_notes, sources))
+            if self.policy.speculative:
+                draft = SectionScore(heading=section.heading, words=section.words, coverage=check.coverage,
+                                     recommendations=_citation_advice(check, len(sources)), passed=False)
+                speculative = asyncio.create_task(self._revise_section(query, section, draft, sources))
             try:
-                d = u.split("://", 1)[1].split("/", 1)[0].removeprefix("www.").lower()
-                domains.append(d)
-            except Exception:
-                pass
-        n = len(domains)
-        counts = Counter(domains)
-        return 1 - sum((c / n) ** 2 for c in counts.values()) if n else 0.0
-
-    def _median_source_age_days(self, iso_dates: list[str | None]) -> float:
-        now = datetime.now(timezone.utc)
-        ages = []
-        for ts in iso_dates:
-            if not ts:
-                continue
-            try:
-                dt = datetime.fromisoformat(ts.replace('Z', '+00:00'))
-                ages.append((now - dt).days)
-            except Exception:
-                pass
-        if not ages:
-            return math.inf
-        ages.sort()
-        m = len(ages) // 2
-        return ages[m] if len(ages) % 2 else (ages[m - 1] + ages[m]) / 2
+                first, judge = await self._score_section(query, section, sources)
+            except BaseException:
+                for task in (speculative, merge):
+                    if task:
+                        task.cancel()
+                raise
+            if first.passed:
+                self.metrics.eval_decision("judge_pass")
+                if speculative:
+                    speculative.cancel()
+                    await asyncio.gather(speculative, return_exceptions=True)
+                    self.metrics.eval_decision("speculative_discarded")
+                if merge:
+                    text = await merge
+                    merged = analyze_section(text, len(sources))
+                    if _checks_pass(merged):
+                        self.metrics.eval_decision("merged")
+                        score = first.model_copy(update={"words": len(text.split()), "coverage": merged.coverage})
+                        return first, (score, judge), text
+                    self.metrics.eval_decision("merge_discarded")
+                return first, (first, judge), None
+            self.metrics.eval_decision("judge_fail")
+            if merge:
+                merge.cancel()
+                await asyncio.gather(merge, return_exceptions=True)
+                self.metrics.eval_decision("merge_discarded")
+            if speculative:
+                self.metrics.eval_decision("speculative_used")
+                text = await speculative
+            else:
+                text = await self._revise_section(query, section, first, sources)
+
+        revision = Section(section.heading, text)
+        if self.policy.rescore():
+            self.metrics.eval_decision("rescored")
+            score, judge = await self._score_section(query, revision, sources)
+        else:
+            # Not re-judged: the first-pass judge (if any) still stands in for the report scores
+            self.metrics.eval_decision("rescore_skipped")
+            check = analyze_section(text, len(sources))
+            score = SectionScore(heading=section.heading, words=revision.words, coverage=check.coverage,
+                                 invalid_citations=check.invalid_citations, passed=_checks_pass(check))
+        return first, (score.model_copy(update={"revised": True}), judge), text
+
+    def _failed_thresholds(self, scores: list[SectionScore], div: float, age: float) -> list[str]:
+        """Names of the quality thresholds the first-pass evaluation failed (for revision-trigger rates)"""
+        judged = [score for score in scores if score.overall is not None]
+        gated = judged + [score for score in scores if score.overall is None and not score.passed]  # fast-failed
+        failed = []
+        if any(score.overall < MIN_OVERALL for score in judged):
+            failed.append("MIN_OVERALL")
+        if any(score.coverage < MIN_COV for score in gated):
+            failed.append("MIN_COV")
+        if any(score.invalid_citations for score in scores):
+            failed.append("VALID_CITES")
+        if div < MIN_DIV:
+            failed.append("MIN_DIV")
+        if age != math.inf and age > MAX_AGE:
+            failed.append("MAX_AGE")
+        return failed
+
+    async def _score_section(self, query: str, section: Section, sources: list[dict]) -> tuple[SectionScore, JudgeScores]:
+        """Local citation checks plus the EvaluatorAgent's scores for one section."""
+        check = analyze_section(section.text, len(sources))
+        eval_input = eval_prompt(self._sources_block(sources), section.text, query, section=section.heading)
+        eval_res = await self._run_agent("evaluate", evaluator_agent.evaluator_agent, eval_input)
+        judge = eval_res.final_output_as(JudgeScores)
+
+        return SectionScore(
+            heading=section.heading,
+            words=section.words,
+            coverage=check.coverage,
+            invalid_citations=check.invalid_citations,
+            overall=judge.overall,
+            recommendations=list(judge.recommendations) + _citation_advice(check, len(sources)),
+            passed=judge.overall >= MIN_OVERALL and _checks_pass(check),
+        ), judge
+
+    async def _revise_section(self, query: str, section: Section, score: SectionScore, sources: list[dict]) -> str:
+        """Regenerate one section from its feedback; returns the new section markdown."""
+        feedback_lines = "\n".join(f"- {r}" for r in score.recommendations) \
+            or "- Tighten unsupported claims and add/repair [n] citations for non-obvious facts."
+        notes = pack_context(f"{section.heading} {query}", self.notes, budget=SECTION_CONTEXT_TOKENS)
+        writer_input = revise_prompt(self._sources_block(sources), section.text, notes.text, feedback_lines, query)
+        result = await self._run_agent("revise", writer_agent.section_writer_agent, writer_input)
+        return self._section_output(section, result)
+
+    @staticmethod
+    def _section_output(section: Section, result) -> str:
+        """The section writer's markdown, with the section's heading line restored if it was dropped."""
+        text = str(result.final_output or "").strip()
+        if not text:
+            return section.text
+        heading_line = section.text.splitlines()[0]
+        if section.heading and not text.startswith("#"):
+            text = f"{heading_line}\n\n{text}"
+        return text + "\n\n"
+
+    def _aggregate_scores(self, scored: list[tuple[SectionScore, JudgeScores | None]]) -> EvaluationReport:
+        """Word-weighted mean of the judged sections' criteria and overall scores."""
+        judged = [(score, judge) for score, judge in scored if judge is not None]
+        if not judged:
+            # Nothing to judge (e.g. the writer returned no text): fail with the lowest scores
+            reason = "No section of the report could be judged."
+            return EvaluationReport(
+                criteria=[EvalCriterionScore(name=name, score=1, justification=reason) for name in _CRITERIA],
+                overall=1,
+                recommendations=[f"{reason} Rewrite the report from the sources."],
+                sections=[score for score, _ in scored],
+            )
+        total = sum(max(score.words, 1) for score, _ in judged)
+
+        def weighted(value) -> float:
+            return round(sum(max(score.words, 1) * value(judge) for score, judge in judged) / total, 1)
+
+        criteria = []
+        for c in judged[0][1].criteria:
+            criteria.append(EvalCriterionScore(
+                name=c.name,
+                score=weighted(lambda j: next((x.score for x in j.criteria if x.name == c.name), j.overall)),
+                justification=f"Word-weighted mean over {len(judged)} judged sections.",
+            ))
+
+        # Prefer fixes for sections that still fail; otherwise surface the judge's suggestions
+        noted = [score for score, _ in scored if not score.passed] or [score for score, _ in judged]
+        recommendations = [f"{score.heading or 'Introduction'}: {r}" for score in noted for r in score.recommendations][:5]
+        return EvaluationReport(
+            criteria=criteria,
+            overall=weighted(lambda j: j.overall),
+            recommendations=recommendations,
+            sections=[score for score, _ in scored],
+        )
@@ -0,0 +1,111 @@
+"""
+Single-flight research runs: identical questions submitted at the same time share
+one pipeline instead of each starting their own.
+
+Runs are keyed by the exact question (report_cache.query_key: case and spacing are
+ignored, word order is not). The first request starts ResearchManager.run in a
+background task; any request for the same key while it is in flight attaches to
+it, replaying the status lines emitted so far (and the latest draft snapshot) before
+following the live stream. When the last subscriber leaves, the run is cancelled;
+its stage checkpoints (checkpoints.py) let the next request for the question pick up
+where it stopped.
+
+All subscribers must share the event loop the run was started on (the Gradio loop).
+"""
+import asyncio
+
+import metrics
+from report_stream import PartialReport
+from research_manager import ResearchManager
+from report_cache import query_key
+
+_END = object()
+
+
+class _Failed:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+class _Flight:
+    def __init__(self, query: str):
+        self.query = query
+        self.history: list = []  # status lines plus the latest PartialReport, for late joiners
+        self.subscribers: set[asyncio.Queue] = set()
+        self.task: asyncio.Task | None = None
+
+    def publish(self, chunk) -> None:
+        if isinstance(chunk, PartialReport) and self.history and isinstance(self.history[-1], PartialReport):
+            self.history[-1] = chunk  # only the newest snapshot is worth replaying
+        else:
+            self.history.append(chunk)
+        for queue in self.subscribers:
+            queue.put_nowait(chunk)
+
+    def close(self, end) -> None:
+        for queue in self.subscribers:
+            queue.put_nowait(end)
+
+
+class RunRegistry:
+    def __init__(self, manager_factory=ResearchManager):
+        self.manager_factory = manager_factory
+        self._flights: dict[str, _Flight] = {}
+        self.started = 0
+        self.joined = 0
+
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+    async def stream(self, query: str):
+        """Status updates and the final report for `query`, from a new or an in-flight run"""
+        key = query_key(query)
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = self._flights[key] = _Flight(query)
+            flight.task = asyncio.create_task(self._drive(key, flight))
+            self.started += 1
+            metrics.SUBSCRIPTIONS.inc("started")
+        else:
+            self.joined += 1
+            metrics.SUBSCRIPTIONS.inc("joined")
+            print(f"Attaching to the in-flight run for {flight.query!r}")
+
+        queue: asyncio.Queue = asyncio.Queue()
+        for chunk in flight.history:
+            queue.put_nowait(chunk)
+        flight.subscribers.add(queue)
+        try:
+            while True:
+                item = await queue.get()
+                if item is _END:
+                    return
+                if isinstance(item, _Failed):
+                    raise item.error
+                yield item
+        finally:
+            flight.subscribers.discard(queue)
+            if not flight.subscribers and not flight.task.done():
+                # Nobody is watching: stop spending on it; a later request resumes from its checkpoint
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+                flight.task.cancel()
+
+    async def _drive(self, key: str, flight: _Flight) -> None:
+        end = _END
+        try:
+            async for chunk in self.manager_factory().run(flight.query):
+                flight.publish(chunk)
+        except asyncio.CancelledError:
+            end = _Failed(RuntimeError("Research run was cancelled"))
+            raise
+        except Exception as e:
+            end = _Failed(e)
+        finally:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+            flight.close(end)
+
+
+# Shared by every UI session in the process
+run_registry = RunRegistry()
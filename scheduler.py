@@ -0,0 +1,314 @@
+import asyncio
+import os
+import random
+import threading
+import time
+from collections import deque
+
+from agents import Runner
+
+from openai_client import OpenAIClientPool, openai_clients as shared_openai_clients
+
+LLM_RPM = float(os.getenv("LLM_RPM", "500"))  # requests per minute, all models
+LLM_TPM = float(os.getenv("LLM_TPM", "200000"))  # tokens per minute, all models
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))  # in-flight calls per model
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "5"))
+LLM_BACKOFF_BASE_S = float(os.getenv("LLM_BACKOFF_BASE_S", "1.0"))
+LLM_BACKOFF_MAX_S = float(os.getenv("LLM_BACKOFF_MAX_S", "30"))
+LLM_EST_OUTPUT_TOKENS = int(os.getenv("LLM_EST_OUTPUT_TOKENS", "1000"))
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Rate limits, timeouts, connection drops and 5xx are retryable; quota exhaustion is not."""
+    if getattr(exc, "code", None) == "insufficient_quota":
+        return False
+    try:
+        import openai
+        if isinstance(exc, (openai.RateLimitError, openai.APIConnectionError,
+                            openai.APITimeoutError, openai.InternalServerError)):
+            return True
+    except ImportError:
+        pass
+    return getattr(exc, "status_code", None) in RETRYABLE_STATUS
+
+
+def _retry_after(exc: BaseException) -> float | None:
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _estimate_tokens(agent, input) -> int:
+    text = str(getattr(agent, "instructions", "") or "") + str(input)
+    return len(text) // 4 + LLM_EST_OUTPUT_TOKENS
+
+
+def _usage_tokens(result) -> int | None:
+    usage = getattr(getattr(result, "context_wrapper", None), "usage", None)
+    return getattr(usage, "total_tokens", None) or None
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled continuously at `per_minute`.
+    reserve() always debits (the balance may go negative) and returns how long
+    the caller must sleep, so waiters are served in arrival order.
+    """
+
+    def __init__(self, per_minute: float):
+        self.rate = per_minute / 60.0
+        self.capacity = per_minute
+        self.tokens = per_minute
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount: float) -> float:
+        with self._lock:
+            self._refill()
+            self.tokens -= min(amount, self.capacity)
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def adjust(self, delta: float) -> None:
+        """Credit (positive) or debit (negative) the bucket once the real cost is known."""
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens + delta)
+
+
+class _Gate:
+    """
+    FIFO concurrency limit that works across event loops (Gradio may drive
+    sessions from different threads), handing freed slots directly to the next waiter.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.active = 0
+        self._waiters: deque[tuple[asyncio.AbstractEventLoop, asyncio.Future]] = deque()
+        self._lock = threading.Lock()
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> None:
+        with self._lock:
+            if self.active < self.limit and not self._waiters:
+                self.active += 1
+                return
+            loop = asyncio.get_running_loop()
+            waiter = (loop, loop.create_future())
+            self._waiters.append(waiter)
+        try:
+            await waiter[1]
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                    raise
+            # The slot was already handed to us; pass it on.
+            self.release()
+            raise
+
+    def release(self) -> None:
+        with self._lock:
+            while self._waiters:
+                loop, fut = self._waiters.popleft()
+                if loop.is_closed():
+                    continue
+                loop.call_soon_threadsafe(_wake, fut)
+                return
+            self.active -= 1
+
+
+def _wake(fut: asyncio.Future) -> None:
+    if not fut.done():
+        fut.set_result(None)
+
+
+class LLMScheduler:
+    """
+    Single entry point for every Runner.run call: enforces request/token-per-minute
+    budgets, caps in-flight calls per model, and retries retryable provider errors
+    with jittered exponential backoff so overload turns into waiting, not lost output.
+    Every call goes through the shared pooled OpenAI client (openai_client.py) unless
+    the caller passes its own run_config.
+    """
+
+    def __init__(
+        self,
+        rpm: float = LLM_RPM,
+        tpm: float = LLM_TPM,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        max_retries: int = LLM_MAX_RETRIES,
+        backoff_base: float = LLM_BACKOFF_BASE_S,
+        backoff_max: float = LLM_BACKOFF_MAX_S,
+        clients: OpenAIClientPool | None = None,
+    ):
+        self.clients = clients or shared_openai_clients
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._gates: dict[str, _Gate] = {}
+        self._lock = threading.Lock()
+        self._wait_times: deque[float] = deque(maxlen=1000)
+        self.queued = 0
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+
+    def _gate(self, model: str) -> _Gate:
+        with self._lock:
+            if model not in self._gates:
+                self._gates[model] = _Gate(self.max_concurrency)
+            return self._gates[model]
+
+    async def _admit(self, gate: _Gate, est_tokens: int) -> None:
+        """Wait for a concurrency slot and rate budget; the caller must release the gate."""
+        start = time.monotonic()
+        with self._lock:
+            self.queued += 1
+        try:
+            await gate.acquire()
+            try:
+                delay = max(self.requests.reserve(1), self.tokens.reserve(est_tokens))
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            except BaseException:
+                gate.release()
+                raise
+        finally:
+            with self._lock:
+                self.queued -= 1
+        with self._lock:
+            self._wait_times.append(time.monotonic() - start)
+
+    def _backoff(self, attempt: int, exc: BaseException) -> float:
+        cap = min(self.backoff_max, self.backoff_base * 2 ** attempt)
+        delay = random.uniform(cap / 2, cap)
+        hint = _retry_after(exc)
+        return max(delay, hint) if hint else delay
+
+    async def run(self, agent, input, **kwargs):
+        """Drop-in replacement for Runner.run(agent, input, **kwargs)."""
+        model = str(getattr(agent, "model", None) or "default")
+        gate = self._gate(model)
+        est = _estimate_tokens(agent, input)
+        kwargs.setdefault("run_config", self.clients.run_config())
+        for attempt in range(self.max_retries + 1):
+            await self._admit(gate, est)
+            try:
+                with self._lock:
+                    self.calls += 1
+                result = await Runner.run(agent, input, **kwargs)
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    with self._lock:
+                        self.failures += 1
+                    raise
+                with self._lock:
+                    self.retries += 1
+                delay = self._backoff(attempt, e)
+                print(f"{getattr(agent, 'name', model)} call failed ({e.__class__.__name__}); "
+                      f"retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+            else:
+                actual = _usage_tokens(result)
+                if actual:
+                    self.tokens.adjust(est - actual)
+                return result
+            finally:
+                gate.release()
+            await asyncio.sleep(delay)
+
+    def run_streamed(self, agent, input, **kwargs) -> "ScheduledStream":
+        """Streaming counterpart of run(); iterate the returned object for SDK stream events."""
+        kwargs.setdefault("run_config", self.clients.run_config())
+        return ScheduledStream(self, agent, input, kwargs)
+
+    def stats(self) -> dict:
+        with self._lock:
+            waits = sorted(self._wait_times)
+            stats = {
+                "queue_depth": self.queued,
+                "in_flight": {m: g.active for m, g in self._gates.items()},
+                "calls": self.calls,
+                "retries": self.retries,
+                "failures": self.failures,
+            }
+        if waits:
+            stats["wait_s"] = {
+                "avg": sum(waits) / len(waits),
+                "p50": waits[len(waits) // 2],
+                "p95": waits[min(len(waits) - 1, int(len(waits) * 0.95))],
+                "max": waits[-1],
+            }
+        return stats
+
+
+class ScheduledStream:
+    """
+    Async-iterable over Runner.run_streamed events, admitted through the scheduler.
+    The concurrency slot is held until the stream ends; a retryable failure is only
+    retried if no model output has been yielded yet. `result` is set once the stream completes.
+    """
+
+    def __init__(self, scheduler: LLMScheduler, agent, input, kwargs: dict):
+        self._scheduler = scheduler
+        self._agent = agent
+        self._input = input
+        self._kwargs = kwargs
+        self.result = None
+
+    def __aiter__(self):
+        return self._events()
+
+    async def _events(self):
+        sched, agent = self._scheduler, self._agent
+        model = str(getattr(agent, "model", None) or "default")
+        gate = sched._gate(model)
+        est = _estimate_tokens(agent, self._input)
+        for attempt in range(sched.max_retries + 1):
+            await sched._admit(gate, est)
+            started = False
+            try:
+                with sched._lock:
+                    sched.calls += 1
+                result = Runner.run_streamed(agent, self._input, **self._kwargs)
+                async for event in result.stream_events():
+                    started = started or getattr(event, "type", "") != "agent_updated_stream_event"
+                    yield event
+            except Exception as e:
+                if started or attempt >= sched.max_retries or not is_retryable(e):
+                    with sched._lock:
+                        sched.failures += 1
+                    raise
+                with sched._lock:
+                    sched.retries += 1
+                delay = sched._backoff(attempt, e)
+                print(f"{getattr(agent, 'name', model)} stream failed ({e.__class__.__name__}); "
+                      f"retry {attempt + 1}/{sched.max_retries} in {delay:.1f}s")
+            else:
+                actual = _usage_tokens(result)
+                if actual:
+                    sched.tokens.adjust(est - actual)
+                self.result = result
+                return
+            finally:
+                gate.release()
+            await asyncio.sleep(delay)
+
+
+# Shared by every ResearchManager in the process so limits are global
+scheduler = LLMScheduler()
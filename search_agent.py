@@ -1,4 +1,4 @@
-from agents import Agent, WebSearchTool, ModelSettings
+from lazy_agents import lazy_agents
 
 INSTRUCTIONS = (
     "You are a research assistant. Given a search term, you search the web for that term and "
@@ -7,10 +7,17 @@ INSTRUCTIONS = (
     "so prioritize signal over style. Do not include anything except the summary."
 ) # the instructions for the search agent
 
-search_agent = Agent(
-    name="Search agent", # name of the agent
-    instructions=INSTRUCTIONS, # instructions for the agent
-    tools=[WebSearchTool(search_context_size="low")], # tool we are using from OpenAI SDK to search from web
-    model="gpt-4o-mini", # openAI model we will use
-    model_settings=ModelSettings(tool_choice="required"), # specify the tool is required
-) # the search agent
\ No newline at end of file
+def _search_agent():
+    from agents import Agent, WebSearchTool, ModelSettings
+    from model_router import model_for
+
+    return Agent(
+        name="Search agent", # name of the agent
+        instructions=INSTRUCTIONS, # instructions for the agent
+        tools=[WebSearchTool(search_context_size="low")], # tool we are using from OpenAI SDK to search from web
+        model=model_for("search"), # openAI model we will use
+        model_settings=ModelSettings(tool_choice="required"), # specify the tool is required
+    ) # the search agent
+
+
+__getattr__ = lazy_agents(__name__, search_agent=_search_agent)
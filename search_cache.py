@@ -0,0 +1,154 @@
+import json
+import os
+import re
+import time
+import unicodedata
+
+import aiosqlite
+
+import sqlite_db
+
+SEARCH_CACHE_ENABLED = os.getenv("SEARCH_CACHE", "1") != "0"
+SEARCH_CACHE_PATH = os.getenv("SEARCH_CACHE_PATH", ".cache/search_cache.sqlite3")
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", str(24 * 3600)))  # seconds
+SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "5000"))
+SEARCH_CACHE_MAX_BYTES = int(os.getenv("SEARCH_CACHE_MAX_BYTES", str(50 * 1024 * 1024)))
+
+_PUNCT = re.compile(r"[^\w\s]+")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS search_cache (
+    key         TEXT PRIMARY KEY,
+    term        TEXT NOT NULL,
+    value       TEXT NOT NULL,
+    size        INTEGER NOT NULL,
+    created_at  REAL NOT NULL,
+    last_access REAL NOT NULL,
+    hit_count   INTEGER NOT NULL DEFAULT 0
+)
+"""
+
+
+def normalize_term(term: str) -> str:
+    """
+    Cache key for a search term: case- and punctuation-insensitive with whitespace
+    collapsed, so "Agentic AI, 2025" and "agentic ai 2025" share one entry. Word order
+    and repeated words are kept: "Python faster than Rust" is a different search.
+    """
+    text = unicodedata.normalize("NFKC", term or "").casefold()
+    return " ".join(_PUNCT.sub(" ", text).split())
+
+
+class SearchCache:
+    """
+    Disk-backed (SQLite) cache of search summaries keyed on the normalized search term.
+    Entries expire after `ttl` seconds; least-recently-used entries are evicted once
+    the table exceeds `max_entries` rows or `max_bytes` of stored values.
+    Cache errors are logged and treated as misses so they never break a run.
+    """
+
+    def __init__(
+        self,
+        path: str = SEARCH_CACHE_PATH,
+        ttl: float = SEARCH_CACHE_TTL,
+        max_entries: int = SEARCH_CACHE_MAX_ENTRIES,
+        max_bytes: int = SEARCH_CACHE_MAX_BYTES,
+        enabled: bool = SEARCH_CACHE_ENABLED,
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.enabled = enabled and ttl > 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    async def get_many(self, terms: list[str]) -> dict[str, object]:
+        """Return {term: cached value} for every term with a fresh entry."""
+        if not self.enabled or not terms:
+            self.misses += len(terms)
+            return {}
+        keys = {term: normalize_term(term) for term in terms}
+        now = time.time()
+        found: dict[str, object] = {}
+        try:
+            db = await sqlite_db.connect(self.path, _SCHEMA)
+            try:
+                uniq = list(set(keys.values()))
+                marks = ",".join("?" for _ in uniq)
+                async with db.execute(
+                    f"SELECT key, value FROM search_cache WHERE created_at > ? AND key IN ({marks})",
+                    (now - self.ttl, *uniq),
+                ) as cur:
+                    rows = {k: json.loads(v) for k, v in await cur.fetchall()}
+                if rows:
+                    await db.executemany(
+                        "UPDATE search_cache SET last_access = ?, hit_count = hit_count + 1 WHERE key = ?",
+                        [(now, k) for k in rows],
+                    )
+                    await db.commit()
+            finally:
+                await db.close()
+            found = {term: rows[key] for term, key in keys.items() if key in rows}
+        except Exception as e:
+            print(f"Search cache read failed: {e}")
+        self.hits += len(found)
+        self.misses += len(terms) - len(found)
+        return found
+
+    async def get(self, term: str) -> object | None:
+        return (await self.get_many([term])).get(term)
+
+    async def put(self, term: str, value: object) -> None:
+        """Store a value (anything JSON-serializable) and apply TTL/LRU/size eviction."""
+        if not self.enabled:
+            return
+        payload = json.dumps(value)
+        now = time.time()
+        try:
+            db = await sqlite_db.connect(self.path, _SCHEMA)
+            try:
+                await db.execute(
+                    "INSERT OR REPLACE INTO search_cache (key, term, value, size, created_at, last_access) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (normalize_term(term), term, payload, len(payload), now, now),
+                )
+                await self._evict(db, now)
+                await db.commit()
+            finally:
+                await db.close()
+        except Exception as e:
+            print(f"Search cache write failed: {e}")
+
+    async def _evict(self, db: aiosqlite.Connection, now: float) -> None:
+        removed = 0
+        cur = await db.execute("DELETE FROM search_cache WHERE created_at <= ?", (now - self.ttl,))
+        removed += max(cur.rowcount, 0)
+        cur = await db.execute(
+            "DELETE FROM search_cache WHERE key IN ("
+            "SELECT key FROM search_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+        removed += max(cur.rowcount, 0)
+        cur = await db.execute(
+            "DELETE FROM search_cache WHERE key IN ("
+            "SELECT key FROM (SELECT key, SUM(size) OVER (ORDER BY last_access DESC) AS running "
+            "FROM search_cache) WHERE running > ?)",
+            (self.max_bytes,),
+        )
+        removed += max(cur.rowcount, 0)
+        self.evictions += removed
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+# Shared by every ResearchManager in the process so counters span runs
+search_cache = SearchCache()
@@ -0,0 +1,166 @@
+"""
+Web sources behind the search summaries.
+
+The search agent's WebSearchTool attaches url_citation annotations (url, title and
+the cited span of the summary) to its answer. search() turns them into a
+SearchResult, and each cited page is recorded once in a SQLite store shared by all
+runs. A page's address is the hash of its canonical URL, so the same page reached
+through a tracking link or a different query is one source.
+"""
+import hashlib
+import os
+import re
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from pydantic import BaseModel
+
+import sqlite_db
+
+SOURCE_STORE_PATH = os.getenv("SOURCE_STORE_PATH", ".cache/sources.sqlite3")
+
+_TRACKING_PARAMS = re.compile(r"^(utm_\w+|gclid|fbclid|mc_cid|mc_eid)$")
+_URL_DATE = re.compile(r"/(20\d{2}|19\d{2})[/-](0?[1-9]|1[0-2])(?:[/-](0?[1-9]|[12]\d|3[01]))?(?=[/-]|$)")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    id           TEXT PRIMARY KEY,
+    url          TEXT NOT NULL,
+    title        TEXT,
+    domain       TEXT NOT NULL,
+    published_at TEXT,
+    first_seen   REAL NOT NULL,
+    last_seen    REAL NOT NULL,
+    seen_count   INTEGER NOT NULL DEFAULT 1
+)
+"""
+
+
+class Source(BaseModel):
+    id: str
+    url: str
+    title: str | None = None
+    domain: str
+    published_at: str | None = None  # ISO date, when the URL carries one
+
+
+class Citation(BaseModel):
+    source_id: str
+    start: int  # span of the summary the source supports
+    end: int
+
+
+class SearchResult(BaseModel):
+    query: str
+    summary: str
+    citations: list[Citation] = []
+
+
+def canonical_url(url: str) -> str:
+    """Lowercased scheme/host without www., default ports, fragments or tracking params."""
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or "").lower().removeprefix("www.")
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query) if not _TRACKING_PARAMS.match(k)))
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit(((parts.scheme or "https").lower(), host, path, query, ""))
+
+
+def source_id(url: str) -> str:
+    return hashlib.sha256(canonical_url(url).encode()).hexdigest()[:16]
+
+
+def date_from_url(url: str) -> str | None:
+    """Publication date from paths like /2025/03/14/ or /2025-03/ (first of the month)."""
+    match = _URL_DATE.search(urlsplit(url).path)
+    if not match:
+        return None
+    year, month, day = match.group(1), int(match.group(2)), int(match.group(3) or 1)
+    return f"{year}-{month:02d}-{day:02d}"
+
+
+def make_source(url: str, title: str | None = None) -> Source:
+    canonical = canonical_url(url)
+    return Source(
+        id=source_id(url),
+        url=canonical,
+        title=title or None,
+        domain=urlsplit(canonical).hostname or "",
+        published_at=date_from_url(url),
+    )
+
+
+def parse_search_output(query: str, result) -> tuple[SearchResult, list[Source]]:
+    """
+    SearchResult plus cited sources from a search agent run. The summary is the
+    text of the final message; citation spans are offsets into it.
+    """
+    parts = []
+    for item in getattr(result, "new_items", None) or []:
+        if getattr(item, "type", "") == "message_output_item":
+            parts = [p for p in item.raw_item.content if getattr(p, "type", "") == "output_text"]
+    if not parts:
+        return SearchResult(query=query, summary=str(result.final_output or "")), []
+
+    summary, citations, sources = "", [], {}
+    for part in parts:
+        offset = len(summary)
+        summary += part.text
+        for ann in getattr(part, "annotations", None) or []:
+            if getattr(ann, "type", "") != "url_citation":
+                continue
+            source = sources.setdefault(source_id(ann.url), make_source(ann.url, ann.title))
+            citations.append(Citation(source_id=source.id, start=offset + ann.start_index, end=offset + ann.end_index))
+    return SearchResult(query=query, summary=summary, citations=citations), list(sources.values())
+
+
+class SourceStore:
+    """
+    Deduplicated, disk-backed record of every cited page, keyed by source_id.
+    A page seen again keeps its first title and gains a date if it didn't have one.
+    Store errors are logged; lookups then return what was found. Every search writes
+    here, so all sessions share one connection (sqlite_db.shared).
+    """
+
+    def __init__(self, path: str = SOURCE_STORE_PATH):
+        self.path = path
+
+    async def put_many(self, sources: list[Source]) -> None:
+        if not sources:
+            return
+        now = time.time()
+        try:
+            db = await sqlite_db.shared(self.path, _SCHEMA)
+            await db.executemany(
+                "INSERT INTO sources (id, url, title, domain, published_at, first_seen, last_seen) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT(id) DO UPDATE SET "
+                "title = COALESCE(sources.title, excluded.title), "
+                "published_at = COALESCE(sources.published_at, excluded.published_at), "
+                "last_seen = excluded.last_seen, seen_count = sources.seen_count + 1",
+                [(s.id, s.url, s.title, s.domain, s.published_at, now, now) for s in sources],
+            )
+            await db.commit()
+        except Exception as e:
+            print(f"Source store write failed: {e}")
+
+    async def get_many(self, ids: list[str]) -> dict[str, Source]:
+        if not ids:
+            return {}
+        found: dict[str, Source] = {}
+        try:
+            db = await sqlite_db.shared(self.path, _SCHEMA)
+            uniq = list(set(ids))
+            marks = ",".join("?" for _ in uniq)
+            async with db.execute(
+                f"SELECT id, url, title, domain, published_at FROM sources WHERE id IN ({marks})", uniq
+            ) as cur:
+                for sid, url, title, domain, published_at in await cur.fetchall():
+                    found[sid] = Source(id=sid, url=url, title=title, domain=domain, published_at=published_at)
+        except Exception as e:
+            print(f"Source store read failed: {e}")
+        return found
+
+
+# Shared by every ResearchManager in the process
+source_store = SourceStore()
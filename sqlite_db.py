@@ -0,0 +1,62 @@
+"""
+SQLite setup shared by the on-disk stores (search cache, report cache, source store).
+
+The first connect() to a file creates its table and switches it to WAL. That runs
+synchronously in a worker thread, serialized by a lock and done once per file and
+schema in the process: first connections racing to change the journal mode fail
+with "database is locked", and doing it on the event loop would stall every session
+while another one holds the file. Later connects go straight to aiosqlite.
+
+shared() is for stores written on every search: one long-lived connection per file
+for the whole process, so concurrent sessions queue on its thread instead of each
+opening a connection and contending for the file's write lock.
+"""
+import asyncio
+import os
+import sqlite3
+import threading
+from contextlib import closing
+
+import aiosqlite
+
+SQLITE_TIMEOUT_S = 5
+
+_init_lock = threading.Lock()
+_ready: set[tuple[str, str]] = set()
+_shared: dict[tuple[str, str], aiosqlite.Connection] = {}
+
+
+def _init_db(path: str, schema: str) -> None:
+    with _init_lock:
+        if (path, schema) in _ready:
+            return
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with closing(sqlite3.connect(path, timeout=SQLITE_TIMEOUT_S)) as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(schema)
+            db.commit()
+        _ready.add((path, schema))
+
+
+async def connect(path: str, schema: str) -> aiosqlite.Connection:
+    """An aiosqlite connection to `path`, creating the file and its table on first use."""
+    if (path, schema) not in _ready:
+        await asyncio.to_thread(_init_db, path, schema)
+    return await aiosqlite.connect(path, timeout=SQLITE_TIMEOUT_S)
+
+
+async def shared(path: str, schema: str) -> aiosqlite.Connection:
+    """The process-wide connection to `path`; callers must not close it."""
+    db = _shared.get((path, schema))
+    if db is not None:
+        return db
+    if (path, schema) not in _ready:
+        await asyncio.to_thread(_init_db, path, schema)
+    db = aiosqlite.connect(path, timeout=SQLITE_TIMEOUT_S)
+    db.daemon = True  # never closed, so it mustn't keep the process alive at exit
+    await db
+    with _init_lock:
+        kept = _shared.setdefault((path, schema), db)
+    if kept is not db:  # another session (or event loop) connected first
+        await db.close()
+    return kept
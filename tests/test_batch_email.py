@@ -0,0 +1,81 @@
+"""
+Resuming a batch sweep with --email: reports whose send failed are sent again.
+"""
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import batch_research
+import fake_runner
+from checkpoints import checkpoints
+from report_cache import report_cache
+from search_cache import search_cache
+from source_store import source_store
+
+
+class _Outbox:
+    """delivery_queue stand-in that fails the first `failures` sends."""
+
+    def __init__(self, failures: int = 0):
+        self.failures = failures
+        self.sent = []
+
+    async def send(self, email):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("SMTP 451 try again later")
+        self.sent.append(email.to)
+
+    async def close(self):
+        pass
+
+    def stats(self) -> dict:
+        return {"sent": len(self.sent)}
+
+
+class BatchEmailResumeTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        path = self.dir.name
+        self.input, self.output = os.path.join(path, "in.jsonl"), os.path.join(path, "out.jsonl")
+        with open(self.input, "w") as f:
+            f.write(json.dumps({"id": 1, "query": "agentic ai in banks", "email": "reader@example.org"}) + "\n")
+        for patch in (mock.patch.object(search_cache, "enabled", False),
+                      mock.patch.object(report_cache, "enabled", False),
+                      mock.patch.object(checkpoints, "enabled", False),
+                      mock.patch.object(source_store, "path", os.path.join(path, "sources.sqlite3"))):
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    async def asyncTearDown(self):
+        self.dir.cleanup()
+
+    async def _run(self, outbox: _Outbox):
+        with fake_runner.install(fake_runner.FakeRunner(scale=0.001)), \
+                mock.patch.object(batch_research, "delivery_queue", outbox):
+            await batch_research.run_batch(self.input, self.output, email=True)
+
+    def _lines(self) -> list[dict]:
+        with open(self.output) as f:
+            return [json.loads(line) for line in f]
+
+    async def test_failed_send_is_retried_on_resume(self):
+        await self._run(_Outbox(failures=1))
+        self.assertIn("email_error", self._lines()[-1])
+        self.assertEqual(len(batch_research.load_unsent(self.output)), 1)
+
+        outbox = _Outbox()
+        await self._run(outbox)
+        self.assertEqual(outbox.sent, ["reader@example.org"])
+        self.assertEqual(self._lines()[-1]["emailed_to"], "reader@example.org")
+        self.assertEqual(batch_research.load_unsent(self.output), [])
+
+        outbox = _Outbox()
+        await self._run(outbox)
+        self.assertEqual(outbox.sent, [])  # delivered once, never again
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+"""
+Judge calls spent by evaluate_and_maybe_revise under the cheaper EVAL_FINAL policies.
+"""
+import unittest
+from unittest import mock
+
+import fake_runner
+from eval_policy import EvalPolicy
+from research_manager import ResearchManager
+from writer_agent import ReportData
+
+SOURCES = [{"url": f"https://example.org/{n}", "title": f"Source {n}", "domain": "example.org",
+            "published_at": None, "snippet": ""} for n in range(1, 6)]
+
+
+_canned_output = fake_runner.canned_output
+
+
+def _failing_judge(stage, input):
+    out = _canned_output(stage, input)
+    if stage == "evaluator":
+        out = out.model_copy(update={"overall": 2.0})
+    return out
+
+
+class EvalPolicyJudgeCallsTest(unittest.IsolatedAsyncioTestCase):
+    async def _evaluate(self, policy: EvalPolicy, markdown: str) -> tuple[fake_runner.FakeRunner, object]:
+        runner = fake_runner.FakeRunner(scale=0.001)
+        with fake_runner.install(runner), mock.patch.object(fake_runner, "canned_output", _failing_judge):
+            rm = ResearchManager(policy=policy)
+            report = ReportData(short_summary="", markdown_report=markdown, follow_up_questions=[])
+            _, eval_report = await rm.evaluate_and_maybe_revise("agentic ai", report, SOURCES)
+        return runner, eval_report
+
+    async def test_skipped_final_judge_reuses_first_pass_scores(self):
+        for policy in (EvalPolicy(fast_fail=False, final="skip"),
+                       EvalPolicy(fast_fail=False, final="sample", final_sample=0.0)):
+            runner, eval_report = await self._evaluate(policy, fake_runner.CANNED_REPORT)
+            self.assertEqual(runner.calls["evaluator"], 3, policy)  # one first-pass judge per section
+            self.assertEqual(runner.calls["section"], 3, policy)
+            self.assertEqual(eval_report.overall, 2.0)
+
+    async def test_all_fast_failed_judges_one_section(self):
+        uncited = fake_runner.CANNED_REPORT.replace("[", "").replace("]", "")
+        runner, eval_report = await self._evaluate(EvalPolicy(fast_fail=True, final="skip"), uncited)
+        self.assertEqual(runner.calls["evaluator"], 1)
+        self.assertEqual(runner.calls["section"], 3)
+        self.assertEqual(sum(score.overall is not None for score in eval_report.sections), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+"""
+Pipelined writing: where late search notes are merged, and resuming with them.
+"""
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import fake_runner
+from checkpoints import CheckpointStore
+from eval_policy import EvalPolicy
+from planner_agent import WebSearchItem, WebSearchPlan
+from report_sections import split_sections
+from research_manager import SECTION_MIN_WORDS, ResearchManager, _assign_notes
+from search_cache import SearchCache
+from source_store import SearchResult, SourceStore
+from writer_agent import ReportData
+
+
+class AssignNotesTest(unittest.TestCase):
+    def test_notes_only_go_to_judged_sections(self):
+        sections = split_sections(fake_runner.CANNED_REPORT + "\n## Finance\n\nAgentic finance.\n")
+        note = ([6], "Agentic finance teams automate reconciliation and reporting [6].")
+        judge_min = 10  # the canned sections are ~20 words, the finance one 4
+        assigned = _assign_notes(sections, [note], judge_min)
+        self.assertEqual(len(assigned), 1)
+        self.assertEqual(sections[next(iter(assigned))].heading, "Adoption")
+
+    def test_draft_without_judged_sections_gets_a_new_one(self):
+        for markdown in ("", "## Title\n\nToo short to judge.\n"):
+            sections = split_sections(markdown)
+            count = len(sections)
+            assigned = _assign_notes(sections, [([1], "A late finding [1].")], SECTION_MIN_WORDS)
+            self.assertEqual(len(sections), count + 1)
+            self.assertEqual(list(assigned), [count])
+
+
+class ResumeDraftTest(unittest.IsolatedAsyncioTestCase):
+    async def test_late_notes_survive_a_draft_checkpoint(self):
+        with tempfile.TemporaryDirectory() as path:
+            checkpoints = CheckpointStore(directory=os.path.join(path, "runs"))
+            query = "agentic ai in banks"
+            plan = WebSearchPlan(searches=[WebSearchItem(reason="test", query=f"topic {i}") for i in range(3)])
+            results = [SearchResult(query=f"topic {i}", summary=f"Banks deploy agents for task {i}.") for i in range(3)]
+            report = ReportData(short_summary="", markdown_report=fake_runner.CANNED_REPORT, follow_up_questions=[])
+            late = [[[], "Banks deploy agents for task 2."]]
+            checkpoints.save(query, "plan", plan.model_dump())
+            checkpoints.save(query, "search", {"plan": plan.model_dump(),
+                                               "results": [r.model_dump() for r in results]})
+            checkpoints.save(query, "draft", {**report.model_dump(), "late_notes": late})
+
+            rm = ResearchManager(checkpoints=checkpoints, cache=SearchCache(enabled=False),
+                                 policy=EvalPolicy(fast_fail=False),
+                                 source_store=SourceStore(path=os.path.join(path, "sources.sqlite3")))
+            merged = []
+            original = rm._merge_section
+
+            async def merge_section(query, section, notes, sources):
+                merged.append(notes)
+                return await original(query, section, notes, sources)
+
+            with fake_runner.install(fake_runner.FakeRunner(scale=0.001)), \
+                    mock.patch.object(rm, "_merge_section", merge_section), \
+                    mock.patch.object(rm.report_cache, "enabled", False):
+                async for _ in rm.run(query):
+                    pass
+        self.assertEqual(merged, [[([], "Banks deploy agents for task 2.")]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+"""
+Report cache lookups for paraphrases of the app's example questions (app.py gr.Examples).
+"""
+import os
+import tempfile
+import unittest
+
+from report_cache import ReportCache
+
+EXAMPLES = [
+    "Exciting commercial applications of agentic AI as of August 2025",
+    "Compare Anthropic, OpenAI, and Google’s agentic tooling for enterprises",
+    "Summarize the latest research on autonomous multi-agent systems",
+]
+
+
+class ReportCacheParaphraseTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.cache = ReportCache(path=os.path.join(self.dir.name, "reports.sqlite3"))
+        for query in EXAMPLES:
+            await self.cache.put(query, {"query": query})
+
+    async def asyncTearDown(self):
+        self.dir.cleanup()
+
+    async def assertServedBy(self, query: str, example: str, hit: bool):
+        cached = await self.cache.lookup(query)
+        self.assertIsNotNone(cached, query)
+        self.assertEqual(cached.query, example)
+        self.assertEqual(cached.similarity >= self.cache.hit_similarity, hit, cached.similarity)
+
+    async def test_lowercased_question_is_a_hit(self):
+        await self.assertServedBy(EXAMPLES[0].lower(), EXAMPLES[0], hit=True)
+
+    async def test_dropped_adjective_is_served(self):
+        await self.assertServedBy("Commercial applications of agentic AI as of August 2025", EXAMPLES[0], hit=False)
+
+    async def test_reordered_list_of_companies_is_served(self):
+        await self.assertServedBy("Compare Google, OpenAI and Anthropic agentic tooling for enterprises",
+                                  EXAMPLES[1], hit=False)
+
+    async def test_synonym_for_a_stopword_is_a_hit(self):
+        await self.assertServedBy("Summarize recent research on autonomous multi-agent systems", EXAMPLES[2], hit=True)
+
+    async def test_different_number_or_entity_misses(self):
+        for query in ("Exciting commercial applications of agentic AI as of August 2024",
+                      "Exciting commercial applications of agentic AI as of March 2025",
+                      "Compare Anthropic, OpenAI, and Microsoft agentic tooling for enterprises"):
+            self.assertIsNone(await self.cache.lookup(query), query)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+"""
+Search quorum and its grace window when part of the plan is served from the search cache.
+
+Run with: python -m unittest discover tests
+"""
+import os
+import tempfile
+import unittest
+
+import fake_runner
+from planner_agent import WebSearchItem, WebSearchPlan
+from research_manager import ResearchManager
+from search_cache import SearchCache
+from source_store import SourceStore
+
+
+class _Straggler(fake_runner.Latency):
+    """Constant latency, except the `nth` call, which takes 100x as long."""
+
+    def __init__(self, median: float, nth: int):
+        super().__init__(median)
+        self.nth, self.count = nth, 0
+
+    def sample(self, rng) -> float:
+        self.count += 1
+        return self.median * (100 if self.count == self.nth else 1)
+
+
+def _plan(n: int) -> WebSearchPlan:
+    return WebSearchPlan(searches=[WebSearchItem(reason="test", query=f"topic {i}") for i in range(n)])
+
+
+class SearchQuorumTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.cache = SearchCache(path=os.path.join(self.dir.name, "search.sqlite3"))
+        self.store = SourceStore(path=os.path.join(self.dir.name, "sources.sqlite3"))
+
+    async def asyncTearDown(self):
+        self.dir.cleanup()
+
+    def _manager(self, **kwargs) -> ResearchManager:
+        kwargs.setdefault("search_quorum", 0.8)
+        return ResearchManager(cache=self.cache, source_store=self.store, **kwargs)
+
+    async def test_cache_hits_do_not_meet_the_quorum_for_live_searches(self):
+        for i in range(4):
+            await self.cache.put(f"topic {i}", {"query": f"topic {i}", "summary": f"cached summary {i}"})
+        with fake_runner.install(fake_runner.FakeRunner(scale=0.01)):
+            rm = self._manager()
+            results = await rm.perform_searches(_plan(5))
+        self.assertEqual(sorted(r.query for r in results), [f"topic {i}" for i in range(5)])
+        self.assertEqual(rm.dropped_searches, [])
+        self.assertIsNotNone(await self.cache.get("topic 4"))  # searched, so cached for the next run
+
+    async def test_quorum_over_live_searches_still_cancels_stragglers(self):
+        await self.cache.put("topic 0", {"query": "topic 0", "summary": "cached summary"})
+        runner = fake_runner.FakeRunner(scale=0.01)
+        runner.latency["search"] = _Straggler(median=4.0, nth=4)
+        with fake_runner.install(runner):
+            rm = self._manager(search_quorum=0.5, search_grace=0.5, search_deadline=5)
+            results = await rm.perform_searches(_plan(5))
+        self.assertEqual(len(results), 4)
+        self.assertEqual([item.query for item in rm.dropped_searches], ["topic 4"])
+        self.assertEqual(rm.dropped_reason, "quorum")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,12 +1,13 @@
 from pydantic import BaseModel, Field
-from agents import Agent
+
+from lazy_agents import lazy_agents
 
 INSTRUCTIONS = (
     "You are a senior researcher writing a cohesive report for a research query. "
-    "You will be provided the query and multiple research notes (summaries of web results). \n"
+    "You will be provided a numbered sources list, research notes (summaries of web results) and the query. \n"
     "First, draft a clear outline. Then write a detailed markdown report (≥1,000 words). \n"
     "CRITICAL: When you assert any non-obvious fact, attach an inline numeric citation like [1] or [2] "
-    "referring to the provided sources list (we will append it in order). Keep claims faithful to sources. "
+    "referring to the numbered sources list (we will append it in order). Keep claims faithful to sources. "
     "Prefer primary/authoritative sources; avoid speculation."
 )
 
@@ -19,9 +20,36 @@ class ReportData(BaseModel):
     follow_up_questions: list[str] = Field(description="Suggested topics to research further")
 
 
-writer_agent = Agent(
-    name="WriterAgent",
-    instructions=INSTRUCTIONS,
-    model="gpt-4o-mini",
-    output_type=ReportData,
-)
\ No newline at end of file
+def _writer_agent():
+    from agents import Agent
+    from model_router import model_for
+
+    return Agent(
+        name="WriterAgent",
+        instructions=INSTRUCTIONS,
+        model=model_for("writer"),
+        output_type=ReportData,
+    )
+
+
+SECTION_INSTRUCTIONS = (
+    "You are a senior researcher revising ONE section of a longer markdown report. "
+    "You will be given the numbered sources list, the section, research notes, reviewer feedback and the query. \n"
+    "Return ONLY the revised section in markdown, starting with its original heading line (if it has one). "
+    "Fix the issues raised; keep claims faithful to the sources and attach inline numeric citations like [1] "
+    "for every non-obvious fact. Do not renumber sources and do not add material that belongs in other sections."
+)
+
+
+def _section_writer_agent():
+    from agents import Agent
+    from model_router import model_for
+
+    return Agent(
+        name="SectionWriterAgent",
+        instructions=SECTION_INSTRUCTIONS,
+        model=model_for("section_writer"),
+    )
+
+
+__getattr__ = lazy_agents(__name__, writer_agent=_writer_agent, section_writer_agent=_section_writer_agent)